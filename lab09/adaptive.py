@@ -0,0 +1,44 @@
+import math
+
+class AdaptiveResolution:
+    def __init__(self, target=1.0 / 30.0, min_scale=0.2, max_scale=1.0, deadband=0.15, up_frames=4, max_step=0.25, smoothing=0.35, quantum=0.025):
+        self.target = target
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.deadband = deadband
+        self.up_frames = up_frames
+        self.max_step = max_step
+        self.smoothing = smoothing
+        self.quantum = quantum
+        self.reset()
+
+    def reset(self):
+        self.scale = self.max_scale
+        self.avg = None
+        self._fast = 0
+        self._calibrated = False
+
+    def _quantize(self, s):
+        s = round(s / self.quantum) * self.quantum
+        return min(self.max_scale, max(self.min_scale, s))
+
+    def update(self, frame_time):
+        self.avg = frame_time if self.avg is None else self.avg + self.smoothing * (frame_time - self.avg)
+        ratio = self.avg / self.target
+        if ratio > 1.0 + self.deadband:
+            self._fast = 0
+        elif ratio < 1.0 - self.deadband and self.scale < self.max_scale:
+            self._fast += 1
+            if self._fast < self.up_frames: return self.scale
+            self._fast = 0
+        else:
+            self._fast = 0
+            return self.scale
+        want = self.scale / math.sqrt(ratio)
+        if self._calibrated:
+            want = min(self.scale * (1.0 + self.max_step), max(self.scale * (1.0 - self.max_step), want))
+        self._calibrated = True
+        new = self._quantize(want)
+        if new != self.scale:
+            self.scale = new; self.avg = None
+        return self.scale
@@ -0,0 +1,159 @@
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import numpy as np
+from PIL import Image
+from engine import Lighting, SceneNode, Texture, load_obj, matrix_rotate_y, matrix_translate
+from offscreen import Camera, OffscreenRenderer, fit_to_view
+
+class OrbitAnimation:
+    def __init__(self, cam_radius=6.0, cam_height=0.0, cam_speed_deg=2.0, cam_angle_deg=0.0, target=(0.0, 0.0, 0.0), fov_deg=60.0,
+                 light_radius=6.0, light_height=2.0, light_speed_deg=12.0, light_angle_deg=0.0, spin_deg=0.0):
+        self.cam_radius = cam_radius
+        self.cam_height = cam_height
+        self.cam_speed_deg = cam_speed_deg
+        self.cam_angle_deg = cam_angle_deg
+        self.target = tuple(target)
+        self.fov_deg = fov_deg
+        self.light_radius = light_radius
+        self.light_height = light_height
+        self.light_speed_deg = light_speed_deg
+        self.light_angle_deg = light_angle_deg
+        self.spin_deg = spin_deg
+
+    def camera(self, i):
+        ang = math.radians((self.cam_angle_deg + i * self.cam_speed_deg) % 360.0)
+        tx, ty, tz = self.target
+        pos = (tx + self.cam_radius * math.cos(ang), self.cam_height, tz + self.cam_radius * math.sin(ang))
+        return Camera(pos, self.target, fov_deg=self.fov_deg)
+
+    def light_pos(self, i):
+        ang = math.radians((self.light_angle_deg + i * self.light_speed_deg) % 360.0)
+        return np.array([self.light_radius * math.cos(ang), self.light_height, self.light_radius * math.sin(ang)], dtype=float)
+
+    def model_matrix(self, center, i):
+        c = center
+        return matrix_translate(-c[0], -c[1], -c[2]) @ matrix_rotate_y(math.radians((i * self.spin_deg) % 360.0)) @ matrix_translate(c[0], c[1], c[2])
+
+    def to_dict(self):
+        return dict(vars(self), target=list(self.target))
+
+def frame_path(out_dir, i):
+    return os.path.join(out_dir, f"frame_{i:05d}.png")
+
+_state = {}
+
+def _init(settings):
+    poly = load_obj(settings['model'])
+    poly.color = settings['color']
+    if settings['fit']: fit_to_view(poly)
+    texture = Texture()
+    if settings['texture'] and not texture.load_texture(settings['texture']):
+        raise ValueError(f"не удалось загрузить текстуру {settings['texture']}")
+    texture.filter = settings['filter']
+    r = OffscreenRenderer(settings['width'], settings['height'], settings['shading'], Lighting(), texture, settings['backend'], 1, settings['scale'])
+    r.cull_enabled = settings['cull']
+    _state.update(poly=poly, node=SceneNode(poly), center=poly.center(), renderer=r, animation=OrbitAnimation(**settings['animation']), out_dir=settings['out_dir'])
+
+def _render_frame(i):
+    anim = _state['animation']; r = _state['renderer']
+    poly = _state['poly']
+    if anim.spin_deg:
+        poly = _state['node']; poly.set_matrix(anim.model_matrix(_state['center'], i))
+    r.lighting.light_pos = anim.light_pos(i)
+    rgb, _ = r.render(poly, anim.camera(i))
+    path = frame_path(_state['out_dir'], i)
+    tmp = path + ".part"
+    Image.fromarray(rgb).save(tmp, format="PNG")
+    os.replace(tmp, path)
+    return i
+
+def _check_manifest(out_dir, settings):
+    path = os.path.join(out_dir, "animation.json")
+    data = {k: v for k, v in settings.items() if k != 'out_dir'}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            if json.load(f) != data:
+                raise ValueError(f"В {out_dir} уже есть кадры с другими параметрами анимации")
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+
+def render_animation(settings, frames, workers=1, progress=None):
+    out_dir = settings['out_dir']
+    os.makedirs(out_dir, exist_ok=True)
+    _check_manifest(out_dir, settings)
+    todo = [i for i in range(frames) if not os.path.exists(frame_path(out_dir, i))]
+    if not todo: return 0
+    if workers <= 1:
+        _init(settings)
+        done = map(_render_frame, todo)
+        for n, i in enumerate(done, 1):
+            if progress: progress(i, n, len(todo))
+        _state.clear()
+        return len(todo)
+    with mp.get_context('spawn').Pool(workers, initializer=_init, initargs=(settings,)) as pool:
+        for n, i in enumerate(pool.imap_unordered(_render_frame, todo), 1):
+            if progress: progress(i, n, len(todo))
+    return len(todo)
+
+def assemble(out_dir, frames, path, fps=25):
+    images = [Image.open(frame_path(out_dir, i)) for i in range(frames)]
+    duration = int(round(1000.0 / fps))
+    if path.lower().endswith(".gif"):
+        images = [im.convert("P", palette=Image.ADAPTIVE) for im in images]
+    images[0].save(path, save_all=True, append_images=images[1:], duration=duration, loop=0)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетный рендер орбитальной анимации в последовательность PNG (с докачкой)")
+    parser.add_argument("model", help="путь к OBJ-файлу")
+    parser.add_argument("-o", "--out-dir", default="frames", help="каталог для кадров frame_NNNNN.png")
+    parser.add_argument("-n", "--frames", type=int, default=180)
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--animation", help="собрать кадры в GIF или APNG (.gif/.png)")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--width", type=int, default=720)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--scale", type=float, default=None)
+    parser.add_argument("--shading", choices=["none", "gouraud", "phong"], default="gouraud")
+    parser.add_argument("--texture")
+    parser.add_argument("--filter", choices=["nearest", "bilinear", "trilinear"], default="nearest")
+    parser.add_argument("--color", default="#5a9bd8")
+    parser.add_argument("--backend", choices=["mesh", "numpy", "python"], default="mesh")
+    parser.add_argument("--cull", action="store_true")
+    parser.add_argument("--no-fit", action="store_true")
+    parser.add_argument("--cam-radius", type=float, default=6.0)
+    parser.add_argument("--cam-height", type=float, default=0.0)
+    parser.add_argument("--cam-speed", type=float, default=2.0, help="градусов за кадр")
+    parser.add_argument("--cam-angle", type=float, default=0.0)
+    parser.add_argument("--fov", type=float, default=60.0)
+    parser.add_argument("--light-radius", type=float, default=6.0)
+    parser.add_argument("--light-height", type=float, default=2.0)
+    parser.add_argument("--light-speed", type=float, default=12.0, help="градусов за кадр")
+    parser.add_argument("--light-angle", type=float, default=0.0)
+    parser.add_argument("--spin", type=float, default=0.0, help="поворот модели вокруг Y, градусов за кадр")
+    args = parser.parse_args(argv)
+    if args.texture and not Texture().load_texture(args.texture):
+        parser.error(f"не удалось загрузить текстуру {args.texture}")
+
+    animation = OrbitAnimation(args.cam_radius, args.cam_height, args.cam_speed, args.cam_angle, fov_deg=args.fov,
+                               light_radius=args.light_radius, light_height=args.light_height, light_speed_deg=args.light_speed,
+                               light_angle_deg=args.light_angle, spin_deg=args.spin)
+    settings = dict(model=os.path.abspath(args.model), out_dir=args.out_dir, width=args.width, height=args.height,
+                    scale=args.scale if args.scale is not None else min(args.width, args.height) / 4.0,
+                    shading=args.shading, texture=args.texture and os.path.abspath(args.texture), filter=args.filter, color=args.color,
+                    backend=args.backend, cull=args.cull, fit=not args.no_fit, animation=animation.to_dict())
+
+    def progress(i, n, total):
+        print(f"\rкадр {i}: {n}/{total}", end="", flush=True)
+    try:
+        rendered = render_animation(settings, args.frames, args.workers, progress)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"\rготово: {rendered} новых кадров, {args.frames - rendered} уже было")
+    if args.animation: assemble(args.out_dir, args.frames, args.animation, args.fps)
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,24 @@
 import math
+import time
 import numpy as np
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from PIL import Image, ImageTk
+from PIL import Image
 from engine import (
-    Face, Polyhedron, Lighting, Texture,
+    SceneNode, Lighting, Texture,
     matrix_translate, matrix_scale, matrix_rotate_x, matrix_rotate_y, matrix_rotate_z,
     matrix_reflect_plane, matrix_rotate_axis_through_point,
     project_perspective, project_orthographic, isometric_rotation_matrix,
     make_tetrahedron, make_cube, make_octahedron, make_icosahedron, make_dodecahedron,
-    compute_face_normal_outward, look_at
+    classify_faces_perspective, classify_faces_isometric, classify_faces_camera,
+    look_at, load_obj, save_obj
 )
+from raster import clip_polygon
+from offscreen import Camera, OffscreenRenderer
+from present import Presenter
+from profiler import FrameProfiler
+from adaptive import AdaptiveResolution
+from scheduler import FrameScheduler
 
 class PolyhedronApp:
     def __init__(self, root):
@@ -18,7 +26,7 @@ class PolyhedronApp:
         root.title("Лабораторная 9 - Освещение и Текстурирование")
         self.canvas_w = 720
         self.canvas_h = 720
-        self.objA = make_cube("#5a9bd8")
+        self.objA = SceneNode(make_cube("#5a9bd8"))
         self.projection_mode = 'perspective'
         self.camera_distance = 5.0
         self.scale = 180.0
@@ -29,6 +37,21 @@ class PolyhedronApp:
         self.cull_enabled = False
         self.zbuffer_enabled = False
         self.render_scale = 1.0
+        self.quality_scale = 1.0
+        self.progressive_enabled = False
+        self.refine_steps = (0.25, 0.5)
+        self.raster_backend = 'mesh'
+        self.render_workers = 1
+        self.hiz_enabled = True
+        self.renderer = OffscreenRenderer(self.canvas_w, self.canvas_h, scale=self.scale)
+        self.presenter = Presenter()
+        self.profiler = FrameProfiler()
+        self.adaptive_enabled = False
+        self.resolution = AdaptiveResolution()
+        self.idle_refine_delay = 0.25
+        self.refine_step_delay = 0.05
+        self._refining = False
+        self.render_time = 0.0
         self.overlay_wire_enabled = True
         self.overlay_wire_front_only = True
         self.wire_on_fill_color = "#ffffff"
@@ -49,6 +72,8 @@ class PolyhedronApp:
         self.light_orbit_angle_deg = 0.0
         self.light_orbit_y = 2.0
         self.anim_enabled = True
+        self.anim_speed_deg = 2.0
+        self.scheduler = FrameScheduler(root, self._advance, self._render_frame, idle=self._idle_refine)
         self.lighting = Lighting()
         self.shading_mode = 'none'
         self.texture = Texture()
@@ -68,8 +93,13 @@ class PolyhedronApp:
         self._build_lighting_tab(tab_light)
         self.fit_in_view()
         self.img_handle = None
+        root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.draw()
-        self.tick()
+
+    def on_close(self):
+        self.scheduler.cancel()
+        self.renderer.close()
+        self.root.destroy()
 
     def create_default_texture(self):
         size = 64
@@ -81,10 +111,7 @@ class PolyhedronApp:
                     pixels[i, j] = (200, 100, 50)
                 else:
                     pixels[i, j] = (50, 100, 200)
-        self.texture.texture_image = img
-        self.texture.texture_data = img.load()
-        self.texture.texture_width, self.texture.texture_height = img.size
-        self.texture.use_texture = True
+        self.texture.set_image(img)
 
     def _build_lighting_tab(self, frame):
         frame.columnconfigure(1, weight=1)
@@ -121,6 +148,9 @@ class PolyhedronApp:
         ttk.Checkbutton(tex_frame, text="Использовать текстуру", variable=self.texture_var, command=self.toggle_texture).grid(row=0, column=0, columnspan=2, sticky="w", padx=4, pady=2)
         ttk.Button(tex_frame, text="Загрузить текстуру", command=self.load_texture_dialog).grid(row=1, column=0, sticky="we", padx=4, pady=2)
         ttk.Button(tex_frame, text="Сбросить текстуру", command=self.reset_texture).grid(row=1, column=1, sticky="we", padx=4, pady=2)
+        ttk.Label(tex_frame, text="Фильтрация:").grid(row=2, column=0, sticky="w", padx=4, pady=2)
+        self.tex_filter_var = tk.StringVar(value=self.texture.filter)
+        ttk.OptionMenu(tex_frame, self.tex_filter_var, self.texture.filter, "nearest", "bilinear", "trilinear", command=self.change_texture_filter).grid(row=2, column=1, sticky="we", padx=4, pady=2)
 
     def change_shading_mode(self, _=None):
         self.shading_mode = self.shading_var.get()
@@ -142,8 +172,13 @@ class PolyhedronApp:
         self.texture.use_texture = self.texture_var.get()
         self.draw()
 
+    def change_texture_filter(self, *_):
+        self.texture.filter = self.tex_filter_var.get()
+        self.draw()
+
     def toggle_light_orbit(self):
         self.light_orbit_enabled = self.light_orbit_var.get()
+        self.scheduler.wake()
 
     def load_texture_dialog(self):
         path = filedialog.askopenfilename(title="Загрузить текстуру", filetypes=[("Изображения", "*.png *.jpg *.jpeg *.bmp *.gif"), ("Все файлы", "*.*")])
@@ -217,14 +252,32 @@ class PolyhedronApp:
         self.anim_var = tk.BooleanVar(value=True)
         self.overlay_wire_var = tk.BooleanVar(value=True)
         self.overlay_wire_mode = tk.StringVar(value="Только фронт")
-        ttk.Checkbutton(flags, text="Отсекать нелицевые (каркас)", variable=self.cull_var, command=self.toggle_cull).grid(row=0, column=0, sticky="w")
+        ttk.Checkbutton(flags, text="Отсекать нелицевые", variable=self.cull_var, command=self.toggle_cull).grid(row=0, column=0, sticky="w")
         ttk.Checkbutton(flags, text="Z-буфер (заливка)", variable=self.zbuf_var, command=self.toggle_zbuf).grid(row=0, column=1, sticky="w")
         ttk.Checkbutton(flags, text="Вращать объект", variable=self.anim_var, command=self.toggle_anim).grid(row=0, column=2, sticky="w")
         ttk.Label(flags, text="Качество Z-буфера:").grid(row=0, column=3, sticky="e")
         self.quality_var = tk.StringVar(value="100%")
-        ttk.OptionMenu(flags, self.quality_var, "100%", "100%", "50%", "33%", "25%", command=self.change_quality).grid(row=0, column=4, sticky="we")
+        ttk.OptionMenu(flags, self.quality_var, "100%", "Авто", "100%", "75%", "50%", "33%", "25%", command=self.change_quality).grid(row=0, column=4, sticky="we")
         ttk.Checkbutton(flags, text="Каркас поверх заливки", variable=self.overlay_wire_var, command=self.toggle_overlay_wire).grid(row=0, column=5, sticky="w")
         ttk.OptionMenu(flags, self.overlay_wire_mode, "Только фронт", "Только фронт", "Все ребра", command=self.change_overlay_mode).grid(row=0, column=6, sticky="we")
+        self.hiz_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(flags, text="Hi-Z отсечение", variable=self.hiz_var, command=self.toggle_hiz).grid(row=1, column=0, sticky="w")
+        self.stats_var = tk.StringVar(value="")
+        ttk.Label(flags, textvariable=self.stats_var).grid(row=1, column=1, columnspan=2, sticky="w")
+        ttk.Label(flags, text="Растеризатор:").grid(row=1, column=3, sticky="e")
+        self.raster_var = tk.StringVar(value="mesh")
+        ttk.OptionMenu(flags, self.raster_var, "mesh", "mesh", "numpy", "python", command=self.change_raster_backend).grid(row=1, column=4, sticky="we")
+        ttk.Label(flags, text="Процессы:").grid(row=1, column=5, sticky="e")
+        self.workers_var = tk.StringVar(value="1")
+        ttk.OptionMenu(flags, self.workers_var, "1", "1", "2", "4", "8", command=self.change_render_workers).grid(row=1, column=6, sticky="we")
+        self.hud_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(flags, text="HUD производительности", variable=self.hud_var, command=self.toggle_hud).grid(row=2, column=0, sticky="w")
+        ttk.Button(flags, text="Сохранить трассу...", command=self.save_trace_dialog).grid(row=2, column=1, sticky="w")
+        ttk.Label(flags, text="Увеличение:").grid(row=2, column=3, sticky="e")
+        self.upscale_var = tk.StringVar(value="nearest")
+        ttk.OptionMenu(flags, self.upscale_var, "nearest", "nearest", "bilinear", command=self.change_upscale).grid(row=2, column=4, sticky="we")
+        self.progressive_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(flags, text="Прогрессивная прорисовка", variable=self.progressive_var, command=self.toggle_progressive).grid(row=2, column=5, columnspan=2, sticky="w")
         ttk.Separator(frame).grid(row=3, column=0, columnspan=2, sticky="we", padx=4, pady=6)
         left = ttk.Frame(frame); left.grid(row=4, column=0, columnspan=2, sticky="we", padx=4)
         for i in range(6): left.columnconfigure(i, weight=1)
@@ -303,7 +356,8 @@ class PolyhedronApp:
         elif name == "Додекаэдр": new = make_dodecahedron(obj.color)
         else: new = make_cube(obj.color)
         new.name = name
-        self.objA = new
+        self.objA = SceneNode(new)
+        self.resolution.reset()
         self.fit_in_view(); self.draw()
 
     def change_projection(self, _=None):
@@ -322,14 +376,39 @@ class PolyhedronApp:
         self.look_vec = v / n
         self.draw()
 
+    def toggle_hiz(self):
+        self.hiz_enabled = self.hiz_var.get(); self.draw()
+
+    def _update_stats_label(self):
+        st = self.renderer.stats
+        if st is None or not self.zbuffer_enabled:
+            self.stats_var.set(""); return
+        self.stats_var.set(f"Отсечено: {st.culled_back} нелиц., {st.culled_frustum} вне кадра; Hi-Z: {st.hiz_triangles()} треуг., {st.hiz_pixels} пикс.")
+
+    def toggle_hud(self):
+        self.profiler.enable(self.hud_var.get(), trace=True); self.draw()
+
+    def save_trace_dialog(self):
+        if self.profiler.trace is None:
+            messagebox.showinfo("Трасса", "Включите HUD производительности, чтобы собирать трассу"); return
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Chrome trace", "*.json"), ("Все файлы", "*.*")], title="Сохранить трассу")
+        if not path: return
+        try:
+            n = self.profiler.dump_trace(path)
+            messagebox.showinfo("Трасса", f"Сохранено событий: {n}")
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить трассу:\n{e}")
+
     def toggle_cull(self):
         self.cull_enabled = self.cull_var.get(); self.draw()
 
     def toggle_zbuf(self):
         self.zbuffer_enabled = self.zbuf_var.get(); self.draw()
+        self._update_stats_label()
 
     def toggle_anim(self):
         self.anim_enabled = self.anim_var.get()
+        self.scheduler.wake()
 
     def toggle_overlay_wire(self):
         self.overlay_wire_enabled = self.overlay_wire_var.get()
@@ -341,11 +420,29 @@ class PolyhedronApp:
 
     def change_quality(self, *_):
         q = self.quality_var.get()
-        if q == "100%": self.render_scale = 1.0
-        elif q == "50%": self.render_scale = 0.5
-        elif q == "33%": self.render_scale = 1.0 / 3.0
-        elif q == "25%": self.render_scale = 0.25
-        else: self.render_scale = 1.0
+        self.adaptive_enabled = (q == "Авто")
+        if self.adaptive_enabled: self.resolution.reset(); self.quality_scale = self.resolution.max_scale
+        elif q == "100%": self.quality_scale = 1.0
+        elif q == "75%": self.quality_scale = 0.75
+        elif q == "50%": self.quality_scale = 0.5
+        elif q == "33%": self.quality_scale = 1.0 / 3.0
+        elif q == "25%": self.quality_scale = 0.25
+        else: self.quality_scale = 1.0
+        self.draw()
+
+    def toggle_progressive(self):
+        self.progressive_enabled = self.progressive_var.get(); self.draw()
+
+    def change_upscale(self, *_):
+        self.presenter.mode = self.upscale_var.get()
+        self.draw()
+
+    def change_raster_backend(self, *_):
+        self.raster_backend = self.raster_var.get()
+        self.draw()
+
+    def change_render_workers(self, *_):
+        self.render_workers = int(self.workers_var.get())
         self.draw()
 
     def fit_in_view(self):
@@ -355,7 +452,7 @@ class PolyhedronApp:
         self.cam_target = np.array([0.0, 0.0, 0.0], dtype=float)
 
     def reset_object(self, which):
-        self.objA = make_cube("#5a9bd8")
+        self.objA = SceneNode(make_cube("#5a9bd8"))
         self.poly_var_A.set("Куб")
         self.fit_in_view(); self.draw()
 
@@ -370,9 +467,14 @@ class PolyhedronApp:
         self.zbuf_var.set(False); self.zbuffer_enabled = False
         self.overlay_wire_var.set(True); self.overlay_wire_enabled = True
         self.overlay_wire_mode.set("Только фронт"); self.overlay_wire_front_only = True
-        self.quality_var.set("100%"); self.render_scale = 1.0
+        self.quality_var.set("100%"); self.quality_scale = 1.0; self.adaptive_enabled = False
+        self.progressive_var.set(False); self.progressive_enabled = False
+        self.upscale_var.set("nearest"); self.presenter.mode = 'nearest'
+        self.raster_var.set("mesh"); self.raster_backend = 'mesh'
+        self.hiz_var.set(True); self.hiz_enabled = True
+        self.workers_var.set("1"); self.change_render_workers()
         self.anim_var.set(True); self.anim_enabled = True
-        self.objA = make_cube("#5a9bd8")
+        self.objA = SceneNode(make_cube("#5a9bd8"))
         self.camera_enabled = False; self.cam_enabled_var.set(False)
         self.cam_pos = np.array([0.0, 0.0, 6.0], dtype=float)
         self.cam_target = np.array([0.0, 0.0, 0.0], dtype=float)
@@ -478,8 +580,7 @@ class PolyhedronApp:
             f = float(self.factor_e.get())
         except ValueError:
             messagebox.showerror("Ошибка ввода", "Коэффициент должен быть числом"); return
-        allV = self.objA.V
-        c = np.mean(allV, axis=0)
+        c = self.objA.center()
         M = matrix_translate(-c[0], -c[1], -c[2]) @ matrix_scale(f, f, f) @ matrix_translate(c[0], c[1], c[2])
         self.objA.apply_matrix(M)
         self.draw()
@@ -489,7 +590,7 @@ class PolyhedronApp:
             angle = math.radians(float(self.angle_axis_e.get()))
         except ValueError:
             messagebox.showerror("Ошибка ввода", "Угол должен быть числом"); return
-        allV = self.objA.V; c = np.mean(allV, axis=0)
+        c = self.objA.center()
         axis = self.axis_var.get()
         M = matrix_rotate_axis_through_point(axis, angle, c)
         self.objA.apply_matrix(M)
@@ -499,150 +600,33 @@ class PolyhedronApp:
         path = filedialog.askopenfilename(title="Открыть OBJ", filetypes=[("Wavefront OBJ", "*.obj"), ("Все файлы", "*.*")])
         if not path: return
         try:
-            poly = self.load_obj(path)
+            poly = load_obj(path)
         except Exception as e:
             messagebox.showerror("Ошибка загрузки", str(e)); return
         poly.color = self.objA.color
-        self.objA = poly
+        self.objA = SceneNode(poly)
+        self.resolution.reset()
         self.fit_in_view(); self.draw()
 
     def save_obj_dialog(self, which):
         path = filedialog.asksaveasfilename(defaultextension=".obj", filetypes=[("Wavefront OBJ", "*.obj"), ("Все файлы", "*.*")], title="Сохранить OBJ")
         if not path: return
         try:
-            self.save_obj(path, self._get_obj(which))
+            save_obj(path, self._get_obj(which))
         except Exception as e:
             messagebox.showerror("Ошибка сохранения", str(e))
 
-    def load_obj(self, path):
-        verts = []; faces = []; tex_coords = []; normals = []
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                s = line.strip()
-                if not s or s.startswith("#"): continue
-                parts = s.split(); tag = parts[0].lower()
-                if tag == "v" and len(parts) >= 4:
-                    x = float(parts[1]); y = float(parts[2]); z = float(parts[3])
-                    verts.append([x, y, z])
-                elif tag == "vt" and len(parts) >= 3:
-                    u = float(parts[1]); v = float(parts[2])
-                    tex_coords.append([u, v])
-                elif tag == "vn" and len(parts) >= 4:
-                    x = float(parts[1]); y = float(parts[2]); z = float(parts[3])
-                    normals.append([x, y, z])
-                elif tag == "f" and len(parts) >= 4:
-                    idxs = []; tex_idxs = []; norm_idxs = []
-                    for tok in parts[1:]:
-                        if "/" in tok:
-                            parts_vert = tok.split("/")
-                            vert_idx = parts_vert[0]
-                            tex_idx = parts_vert[1] if len(parts_vert) > 1 and parts_vert[1] else "0"
-                            norm_idx = parts_vert[2] if len(parts_vert) > 2 and parts_vert[2] else "0"
-                        else:
-                            vert_idx = tok; tex_idx = "0"; norm_idx = "0"
-                        if vert_idx == "" or vert_idx == "0": continue
-                        i_vert = int(vert_idx)
-                        if i_vert < 0: i_vert = len(verts) + 1 + i_vert
-                        idxs.append(i_vert - 1)
-                        if tex_idx != "0" and tex_idx != "":
-                            i_tex = int(tex_idx)
-                            if i_tex < 0: i_tex = len(tex_coords) + 1 + i_tex
-                            tex_idxs.append(i_tex - 1)
-                        else:
-                            tex_idxs.append(0)
-                        if norm_idx != "0" and norm_idx != "":
-                            i_norm = int(norm_idx)
-                            if i_norm < 0: i_norm = len(normals) + 1 + i_norm
-                            norm_idxs.append(i_norm - 1)
-                        else:
-                            norm_idxs.append(0)
-                    if len(idxs) >= 3:
-                        face = Face(idxs)
-                        if tex_idxs and len(tex_idxs) == len(idxs):
-                            face.tex_coords = [tex_coords[i] if i < len(tex_coords) else [0, 0] for i in tex_idxs]
-                        faces.append(face)
-        if len(verts) == 0 or len(faces) == 0:
-            raise ValueError("Пустая модель или отсутствуют грани")
-        vertex_normals = None
-        if normals and len(normals) > 0:
-            vertex_normals = np.array(normals, dtype=float)
-        tex_coords_array = None
-        if tex_coords and len(tex_coords) > 0:
-            tex_coords_array = np.array(tex_coords, dtype=float)
-        return Polyhedron(np.array(verts, dtype=float), faces, vertex_normals=vertex_normals, tex_coords=tex_coords_array)
-
-    def save_obj(self, path, poly: Polyhedron):
-        with open(path, "w", encoding="utf-8") as f:
-            for v in poly.V:
-                f.write(f"v {v[0]} {v[1]} {v[2]}\n")
-            if poly.tex_coords is not None:
-                for tc in poly.tex_coords:
-                    f.write(f"vt {tc[0]} {tc[1]}\n")
-            if poly.vertex_normals is not None:
-                for vn in poly.vertex_normals:
-                    f.write(f"vn {vn[0]} {vn[1]} {vn[2]}\n")
-            for face in poly.faces:
-                idxs = []
-                for i, idx in enumerate(face.indices):
-                    vert_idx = str(idx + 1)
-                    tex_idx = ""
-                    norm_idx = ""
-                    if face.tex_coords and i < len(face.tex_coords):
-                        tex_idx = str(i + 1)
-                    if poly.vertex_normals is not None:
-                        norm_idx = str(idx + 1)
-                    if tex_idx and norm_idx:
-                        idxs.append(f"{vert_idx}/{tex_idx}/{norm_idx}")
-                    elif tex_idx:
-                        idxs.append(f"{vert_idx}/{tex_idx}")
-                    elif norm_idx:
-                        idxs.append(f"{vert_idx}//{norm_idx}")
-                    else:
-                        idxs.append(vert_idx)
-                f.write("f " + " ".join(idxs) + "\n")
-
     def classify_faces_perspective(self, V_world, faces):
-        cam_pos = np.array([0.0, 0.0, self.camera_distance])
-        obj_center = np.mean(V_world, axis=0)
-        front, back = [], []
-        for f in faces:
-            idx = np.array(f.indices)
-            centroid = np.mean(V_world[idx], axis=0)
-            n = compute_face_normal_outward(V_world, f.indices, obj_center)
-            if np.allclose(n, 0.0): continue
-            view_vec = cam_pos - centroid
-            if np.dot(n, view_vec) > 0:
-                front.append(f)
-            else:
-                back.append(f)
-        return front, back
+        with self.profiler.stage('classify'):
+            return classify_faces_perspective(V_world, faces, self.camera_distance)
 
     def classify_faces_isometric(self, V_iso, faces):
-        obj_center_iso = np.mean(V_iso, axis=0)
-        front, back = [], []
-        for f in faces:
-            n = compute_face_normal_outward(V_iso, f.indices, obj_center_iso)
-            if np.allclose(n, 0.0): continue
-            if np.dot(n, self.look_vec) < 0:
-                front.append(f)
-            else:
-                back.append(f)
-        return front, back
+        with self.profiler.stage('classify'):
+            return classify_faces_isometric(V_iso, faces, self.look_vec)
 
     def classify_faces_camera(self, V_eye, faces):
-        obj_center_eye = np.mean(V_eye, axis=0)
-        front, back = [], []
-        for f in faces:
-            idx = np.array(f.indices)
-            centroid_eye = np.mean(V_eye[idx], axis=0)
-            n_eye = compute_face_normal_outward(V_eye, f.indices, obj_center_eye)
-            if np.allclose(n_eye, 0.0): continue
-            view_vec = -centroid_eye
-            if np.dot(n_eye, view_vec) > 0:
-                front.append(f)
-            else:
-                back.append(f)
-        return front, back
+        with self.profiler.stage('classify'):
+            return classify_faces_camera(V_eye, faces)
 
     def _draw_face_wire(self, V3, face, mode, outline, width):
         if mode == 'persp':
@@ -658,31 +642,20 @@ class PolyhedronApp:
         self.canvas.create_polygon(coords, fill="", outline=outline, width=width)
 
     def _draw_face_wire_camera(self, V_eye, face, f, outline=None, width=2):
-        idx = face.indices
-        pts = V_eye[idx]
-        ze = pts[:, 2]
-        if np.any(ze >= -1e-6):
+        pts = clip_polygon(V_eye[face.indices], self.renderer.clip_planes(f, 0.0, self.canvas_w, self.canvas_h, self.scale))
+        if len(pts) < 2:
             return
+        ze = pts[:, 2]
         x = pts[:, 0]; y = pts[:, 1]; zpos = -ze
         x2 = (x * f) / (zpos + 1e-12)
         y2 = (y * f) / (zpos + 1e-12)
         coords = []
-        for i in range(len(idx)):
+        for i in range(len(pts)):
             sx = float(x2[i] * self.scale + self.offset[0])
             sy = float(y2[i] * self.scale + self.offset[1])
             coords.extend([sx, sy])
         self.canvas.create_polygon(coords, fill="", outline=(outline if outline is not None else self.front_outline), width=width)
 
-    def _color_to_rgb(self, color):
-        if isinstance(color, str) and color.startswith("#"):
-            return (int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16))
-        return (90, 155, 216)
-
-    def _apply_lighting_to_color(self, base_color, intensity):
-        r, g, b = base_color
-        r = int(r * intensity); g = int(g * intensity); b = int(b * intensity)
-        return (max(0, min(255, r)), max(0, min(255, g)), max(0, min(255, b)))
-
     def _rgb_to_hex(self, rgb):
         return f"#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}"
 
@@ -728,234 +701,66 @@ class PolyhedronApp:
             self.canvas.create_text(x1 + 8, y1, text=label, fill=color, anchor="w", font=("TkDefaultFont", 10, "bold"))
 
     def render_zbuffer(self):
-        if self.camera_enabled:
-            return self.render_zbuffer_camera()
-        Wc, Hc = self.canvas_w, self.canvas_h
-        s = self.render_scale
-        Wr = max(1, int(Wc * s))
-        Hr = max(1, int(Hc * s))
-        zbuf = np.full((Hr, Wr), np.inf, dtype=float)
-        rgb = np.zeros((Hr, Wr, 3), dtype=np.uint8)
-        d = self.camera_distance
-        scale_r = self.scale * s
-        offset_r = np.array([Wr / 2.0, Hr / 2.0], dtype=float)
-
-        def to_screen(pts2):
-            sx = (pts2[:, 0] * scale_r + offset_r[0]).astype(np.float32)
-            sy = (pts2[:, 1] * scale_r + offset_r[1]).astype(np.float32)
-            return sx, sy
-
-        def tri_rasterize(sx, sy, zdepth, color, tex_coords=None, normals=None, positions=None):
-            minx = max(int(np.floor(min(sx))), 0); maxx = min(int(np.ceil(max(sx))), Wr - 1)
-            miny = max(int(np.floor(min(sy))), 0); maxy = min(int(np.ceil(max(sy))), Hr - 1)
-            if minx > maxx or miny > maxy: return
-            x1, y1, z1 = sx[0], sy[0], zdepth[0]
-            x2, y2, z2 = sx[1], sy[1], zdepth[1]
-            x3, y3, z3 = sx[2], sy[2], zdepth[2]
-            denom = ((y2 - y3) * (x1 - x3) + (x3 - x2) * (y1 - y3))
-            if abs(denom) < 1e-8: return
-            A1 = (y2 - y3); B1 = (x3 - x2)
-            A2 = (y3 - y1); B2 = (x1 - x3)
-            Cx = x3; Cy = y3
-            for y in range(miny, maxy + 1):
-                py = y + 0.5
-                for x in range(minx, maxx + 1):
-                    px = x + 0.5
-                    w1 = (A1 * (px - Cx) + B1 * (py - Cy)) / denom
-                    w2 = (A2 * (px - Cx) + B2 * (py - Cy)) / denom
-                    w3 = 1.0 - w1 - w2
-                    if w1 < 0 or w2 < 0 or w3 < 0: continue
-                    z = w1 * z1 + w2 * z2 + w3 * z3
-                    if z < zbuf[y, x]:
-                        zbuf[y, x] = z
-                        if self.shading_mode == 'phong' and normals is not None and positions is not None:
-                            interp_normal = w1 * normals[0] + w2 * normals[1] + w3 * normals[2]
-                            nrm = np.linalg.norm(interp_normal)
-                            if nrm > 0: interp_normal = interp_normal / nrm
-                            interp_pos = w1 * positions[0] + w2 * positions[1] + w3 * positions[2]
-                            view_dir = -interp_pos / (np.linalg.norm(interp_pos) + 1e-12)
-                            intensity = self.lighting.phong_shading(interp_normal, view_dir, interp_pos)
-                            final_color = self._apply_lighting_to_color(color, intensity)
-                        elif self.shading_mode == 'gouraud' and normals is not None:
-                            i1 = self.lighting.lambert_shading(normals[0])
-                            i2 = self.lighting.lambert_shading(normals[1])
-                            i3 = self.lighting.lambert_shading(normals[2])
-                            interp_intensity = w1 * i1 + w2 * i2 + w3 * i3
-                            final_color = self._apply_lighting_to_color(color, interp_intensity)
-                        else:
-                            final_color = color
-                        if self.texture.use_texture and tex_coords is not None:
-                            u = w1 * tex_coords[0][0] + w2 * tex_coords[1][0] + w3 * tex_coords[2][0]
-                            v = w1 * tex_coords[0][1] + w2 * tex_coords[1][1] + w3 * tex_coords[2][1]
-                            tex_color = self.texture.get_color(u, v)
-                            if self.shading_mode != 'none':
-                                if self.shading_mode == 'phong' and normals is not None and positions is not None:
-                                    intensity = self.lighting.phong_shading(interp_normal, view_dir, interp_pos)
-                                elif self.shading_mode == 'gouraud' and normals is not None:
-                                    intensity = interp_intensity
-                                else:
-                                    intensity = 1.0
-                                tex_color = (int(tex_color[0] * intensity), int(tex_color[1] * intensity), int(tex_color[2] * intensity))
-                            rgb[y, x] = tex_color
-                        else:
-                            rgb[y, x] = final_color
-
-        obj = self.objA
-        V = obj.V.copy()
-        if self.projection_mode == 'perspective':
-            pts2 = project_perspective(V, camera_distance=d)
-            depth = (d - V[:, 2])
-        else:
-            R = isometric_rotation_matrix()
-            V = (R @ V.T).T
-            pts2 = project_orthographic(V)
-            depth = (-V[:, 2])
-        sx_all, sy_all = to_screen(pts2)
-        base_color = self._color_to_rgb(obj.color)
-        for f in obj.faces:
-            idx = f.indices
-            if len(idx) < 3: continue
-            i0 = idx[0]
-            for t in range(1, len(idx) - 1):
-                i1 = idx[t]; i2 = idx[t + 1]
-                sx = np.array([sx_all[i0], sx_all[i1], sx_all[i2]], dtype=np.float32)
-                sy = np.array([sy_all[i0], sy_all[i1], sy_all[i2]], dtype=np.float32)
-                zdepth = np.array([depth[i0], depth[i1], depth[i2]], dtype=np.float32)
-                tex_coords = None; normals = None; positions = None
-                if f.tex_coords and len(f.tex_coords) >= len(idx):
-                    tex_coords = [f.tex_coords[0], f.tex_coords[t], f.tex_coords[t + 1]]
-                if obj.vertex_normals is not None:
-                    normals = [obj.vertex_normals[i0], obj.vertex_normals[i1], obj.vertex_normals[i2]]
-                if self.shading_mode == 'phong':
-                    positions = [V[i0], V[i1], V[i2]]
-                tri_rasterize(sx, sy, zdepth, base_color, tex_coords, normals, positions)
-        header = f"P6 {Wr} {Hr} 255\n".encode("ascii")
-        data = rgb.tobytes()
-        ppm = header + data
-        img_small = tk.PhotoImage(data=ppm, format="PPM")
-        if s == 1.0:
-            return img_small
-        zoom = int(round(1.0 / s))
-        img_zoom = img_small.zoom(zoom, zoom)
-        return img_zoom
-
-    def render_zbuffer_camera(self):
-        Wc, Hc = self.canvas_w, self.canvas_h
-        s = self.render_scale
-        Wr = max(1, int(Wc * s))
-        Hr = max(1, int(Hc * s))
-        zbuf = np.full((Hr, Wr), np.inf, dtype=float)
-        rgb = np.zeros((Hr, Wr, 3), dtype=np.uint8)
-        f = 1.0 / math.tan(math.radians(self.cam_fov_deg) * 0.5)
-        scale_r = self.scale * s
-        offset_r = np.array([Wr / 2.0, Hr / 2.0], dtype=float)
-
-        def to_screen_from_xy(x2, y2):
-            sx = (x2 * scale_r + offset_r[0]).astype(np.float32)
-            sy = (y2 * scale_r + offset_r[1]).astype(np.float32)
-            return sx, sy
-
-        def tri_rasterize(sx, sy, zdepth, color, tex_coords=None, normals=None, positions=None):
-            minx = max(int(np.floor(min(sx))), 0); maxx = min(int(np.ceil(max(sx))), Wr - 1)
-            miny = max(int(np.floor(min(sy))), 0); maxy = min(int(np.ceil(max(sy))), Hr - 1)
-            if minx > maxx or miny > maxy: return
-            x1, y1, z1 = sx[0], sy[0], zdepth[0]
-            x2, y2, z2 = sx[1], sy[1], zdepth[1]
-            x3, y3, z3 = sx[2], sy[2], zdepth[2]
-            denom = ((y2 - y3) * (x1 - x3) + (x3 - x2) * (y1 - y3))
-            if abs(denom) < 1e-8: return
-            A1 = (y2 - y3); B1 = (x3 - x2)
-            A2 = (y3 - y1); B2 = (x1 - x3)
-            Cx = x3; Cy = y3
-            for y in range(miny, maxy + 1):
-                py = y + 0.5
-                for x in range(minx, maxx + 1):
-                    px = x + 0.5
-                    w1 = (A1 * (px - Cx) + B1 * (py - Cy)) / denom
-                    w2 = (A2 * (px - Cx) + B2 * (py - Cy)) / denom
-                    w3 = 1.0 - w1 - w2
-                    if w1 < 0 or w2 < 0 or w3 < 0: continue
-                    z = w1 * z1 + w2 * z2 + w3 * z3
-                    if z < zbuf[y, x]:
-                        zbuf[y, x] = z
-                        if self.shading_mode == 'phong' and normals is not None and positions is not None:
-                            interp_normal = w1 * normals[0] + w2 * normals[1] + w3 * normals[2]
-                            nrmv = np.linalg.norm(interp_normal)
-                            if nrmv > 0: interp_normal = interp_normal / nrmv
-                            view_dir = -positions[0] / (np.linalg.norm(positions[0]) + 1e-12)
-                            intensity = self.lighting.phong_shading(interp_normal, view_dir, positions[0])
-                            final_color = self._apply_lighting_to_color(color, intensity)
-                        elif self.shading_mode == 'gouraud' and normals is not None:
-                            i1 = self.lighting.lambert_shading(normals[0])
-                            i2 = self.lighting.lambert_shading(normals[1])
-                            i3 = self.lighting.lambert_shading(normals[2])
-                            interp_intensity = w1 * i1 + w2 * i2 + w3 * i3
-                            final_color = self._apply_lighting_to_color(color, interp_intensity)
-                        else:
-                            final_color = color
-                        if self.texture.use_texture and tex_coords is not None:
-                            u = w1 * tex_coords[0][0] + w2 * tex_coords[1][0] + w3 * tex_coords[2][0]
-                            v = w1 * tex_coords[0][1] + w2 * tex_coords[1][1] + w3 * tex_coords[2][1]
-                            tex_color = self.texture.get_color(u, v)
-                            if self.shading_mode != 'none':
-                                if self.shading_mode == 'phong' and normals is not None and positions is not None:
-                                    intensity = self.lighting.phong_shading(interp_normal, view_dir, positions[0])
-                                elif self.shading_mode == 'gouraud' and normals is not None:
-                                    intensity = interp_intensity
-                                else:
-                                    intensity = 1.0
-                                tex_color = (int(tex_color[0] * intensity), int(tex_color[1] * intensity), int(tex_color[2] * intensity))
-                            rgb[y, x] = tex_color
-                        else:
-                            rgb[y, x] = final_color
-
-        Vview = look_at(self.cam_pos, self.cam_target, self.cam_up)
-        obj = self.objA
-        V = obj.V
-        N = V.shape[0]
-        hom = np.hstack([V, np.ones((N, 1))])
-        eye = (Vview @ hom.T).T[:, :3]
-        ze = eye[:, 2]
-        mask = ze < -1e-6
-        if np.any(mask):
-            xproj = (eye[:, 0] * f) / (-ze + 1e-12)
-            yproj = (eye[:, 1] * f) / (-ze + 1e-12)
-            depth = -ze
-            sx_all, sy_all = to_screen_from_xy(xproj, yproj)
-            base_color = self._color_to_rgb(obj.color)
-            for fce in obj.faces:
-                idx = fce.indices
-                if len(idx) < 3: continue
-                i0 = idx[0]
-                for t in range(1, len(idx) - 1):
-                    i1 = idx[t]; i2 = idx[t + 1]
-                    if not (mask[i0] and mask[i1] and mask[i2]): continue
-                    sx = np.array([sx_all[i0], sx_all[i1], sx_all[i2]], dtype=np.float32)
-                    sy = np.array([sy_all[i0], sy_all[i1], sy_all[i2]], dtype=np.float32)
-                    zdepth = np.array([depth[i0], depth[i1], depth[i2]], dtype=np.float32)
-                    tex_coords = None; normals = None; positions = None
-                    if fce.tex_coords and len(fce.tex_coords) >= len(idx):
-                        tex_coords = [fce.tex_coords[0], fce.tex_coords[t], fce.tex_coords[t + 1]]
-                    if obj.vertex_normals is not None:
-                        normals = [obj.vertex_normals[i0], obj.vertex_normals[i1], obj.vertex_normals[i2]]
-                    if self.shading_mode == 'phong':
-                        positions = [eye[i0], eye[i1], eye[i2]]
-                    tri_rasterize(sx, sy, zdepth, base_color, tex_coords, normals, positions)
-        header = f"P6 {Wr} {Hr} 255\n".encode("ascii")
-        data = rgb.tobytes()
-        ppm = header + data
-        img_small = tk.PhotoImage(data=ppm, format="PPM")
-        if s == 1.0:
-            return img_small
-        zoom = int(round(1.0 / s))
-        img_zoom = img_small.zoom(zoom, zoom)
-        return img_zoom
+        r = self.renderer
+        r.width, r.height, r.scale, r.render_scale = self.canvas_w, self.canvas_h, self.scale, self.render_scale
+        r.shading_mode, r.lighting, r.texture, r.backend = self.shading_mode, self.lighting, self.texture, self.raster_backend
+        r.set_workers(self.render_workers)
+        r.cull_enabled, r.hiz_enabled = self.cull_enabled, self.hiz_enabled
+        r.projection_mode, r.camera_distance = self.projection_mode, self.camera_distance
+        camera = Camera(self.cam_pos, self.cam_target, self.cam_up, self.cam_fov_deg) if self.camera_enabled else None
+        t0 = time.perf_counter()
+        with self.profiler.stage('render'):
+            rgb, _ = r.render(self.objA, camera)
+        with self.profiler.stage('upload'):
+            photo = self.presenter.present(rgb, self.canvas_w, self.canvas_h)
+        self.render_time = time.perf_counter() - t0
+        return photo
 
     def draw(self):
+        self.scheduler.redraw()
+
+    def _render_frame(self):
+        prof = self.profiler
+        adaptive = self.adaptive_enabled and self.zbuffer_enabled and not self._refining
+        if not self._refining: self.render_scale = self._interactive_scale()
+        with prof.stage('canvas'):
+            self._draw_scene()
+        if adaptive: self.resolution.update(self.render_time)
+        if prof.enabled:
+            prof.end_frame(**self._frame_counters())
+            self._draw_hud()
+        if not self._animating() and self._refine_next() is not None:
+            self.scheduler.wake(self.refine_step_delay if self._refining else self.idle_refine_delay)
+
+    def _interactive_scale(self):
+        if self.zbuffer_enabled and self.adaptive_enabled: return min(self.resolution.scale, self.quality_scale)
+        if self.zbuffer_enabled and self.progressive_enabled: return min(self.refine_steps[0], self.quality_scale)
+        return self.quality_scale
+
+    def _refine_next(self):
+        final = self.quality_scale
+        if not self.zbuffer_enabled or self.render_scale >= final - 1e-9: return None
+        if not self.progressive_enabled: return final
+        return min([s for s in self.refine_steps if self.render_scale + 1e-9 < s < final] + [final])
+
+    def _frame_counters(self):
+        fb = self.renderer.framebuffer
+        if not self.zbuffer_enabled or fb is None:
+            return {'faces': len(self.objA.faces)}
+        st = self.renderer.stats
+        return {'triangles': len(st.kept) if st is not None else 0, 'pixels': int(np.count_nonzero(np.isfinite(fb.gbuf.depth)))}
+
+    def _draw_hud(self):
+        lines = self.profiler.hud_lines()
+        if not lines: return
+        self.canvas.create_text(8, 8, text="\n".join(lines), fill="#f0e68c", anchor="nw", font=("TkFixedFont", 9))
+
+    def _draw_scene(self):
         self.canvas.delete("all")
         self._draw_axes()
         if self.zbuffer_enabled:
             self.img_handle = self.render_zbuffer()
+            self._update_stats_label()
             self.canvas.create_image(0, 0, image=self.img_handle, anchor="nw")
             if self.overlay_wire_enabled and not self.camera_enabled:
                 obj = self.objA
@@ -1048,8 +853,11 @@ class PolyhedronApp:
                 for fce in sorted(front, key=depth_key, reverse=True):
                     self._draw_face_wire(V, fce, mode='ortho', outline=self.front_outline, width=2)
 
-    def tick(self):
-        did_draw = False
+    def _animating(self):
+        return (self.camera_enabled and self.cam_orbit_enabled) or self.light_orbit_enabled or self.anim_enabled
+
+    def _advance(self, dt):
+        k = dt / self.scheduler.interval
         if self.camera_enabled and self.cam_orbit_enabled:
             try:
                 r = float(self.rad_e.get())
@@ -1061,30 +869,35 @@ class PolyhedronApp:
                 spd = self.cam_orbit_speed_deg
             self.cam_orbit_radius = r
             self.cam_orbit_speed_deg = spd
-            self.cam_angle_deg = (self.cam_angle_deg + self.cam_orbit_speed_deg) % 360.0
+            self.cam_angle_deg = (self.cam_angle_deg + self.cam_orbit_speed_deg * k) % 360.0
             ang = math.radians(self.cam_angle_deg)
             cx = self.cam_target[0] + r * math.cos(ang)
             cz = self.cam_target[2] + r * math.sin(ang)
             cy = self.cam_pos[1]
             self.cam_pos = np.array([cx, cy, cz], dtype=float)
-            did_draw = True
         if self.light_orbit_enabled:
-            self.light_orbit_angle_deg = (self.light_orbit_angle_deg + 12.0) % 360.0
+            self.light_orbit_angle_deg = (self.light_orbit_angle_deg + self.light_orbit_speed_deg * k) % 360.0
             ang = math.radians(self.light_orbit_angle_deg)
             lx = self.light_orbit_radius * math.cos(ang)
             lz = self.light_orbit_radius * math.sin(ang)
             ly = self.light_orbit_y
             self.lighting.light_pos = np.array([lx, ly, lz], dtype=float)
-            did_draw = True
-        if self.anim_enabled:
-            allV = self.objA.V
-            c = np.mean(allV, axis=0)
-            M = matrix_translate(-c[0], -c[1], -c[2]) @ matrix_rotate_y(math.radians(2.0)) @ matrix_translate(c[0], c[1], c[2])
-            self.objA.apply_matrix(M)
-            did_draw = True
-        if did_draw:
-            self.draw()
-        self.root.after(33, self.tick)
+        if self.anim_enabled and k > 0:
+            c = self.objA.center()
+            M = matrix_translate(-c[0], -c[1], -c[2]) @ matrix_rotate_y(math.radians(self.anim_speed_deg * k)) @ matrix_translate(c[0], c[1], c[2])
+            with self.profiler.stage('transform'):
+                self.objA.apply_matrix(M)
+        return self._animating()
+
+    def _idle_refine(self):
+        scale = self._refine_next()
+        if scale is None: return
+        self._refining = True
+        self.render_scale = scale
+        try:
+            self._render_frame()
+        finally:
+            self._refining = False
 
     def toggle_camera(self):
         self.camera_enabled = self.cam_enabled_var.get()
@@ -1092,6 +905,7 @@ class PolyhedronApp:
 
     def toggle_cam_orbit(self):
         self.cam_orbit_enabled = self.cam_orbit_var.get()
+        self.scheduler.wake()
 
     def apply_camera_params(self):
         try:
@@ -0,0 +1,125 @@
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+import numpy as np
+from engine import Lighting, SceneNode, Texture, classify_faces_perspective, load_obj, matrix_rotate_x, matrix_rotate_y
+from offscreen import OffscreenRenderer, fit_to_view
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS = [os.path.join(ROOT, "lab14", f"model{i}.obj") for i in range(1, 6)] + [os.path.join(ROOT, "lab13", "objectOrbit.obj")]
+SHADING = ('none', 'gouraud', 'phong')
+PERCENTILES = (10, 50, 90, 99)
+
+def checker_texture(size=64, cell=8):
+    i, j = np.indices((size, size))
+    even = ((i // cell + j // cell) % 2 == 0)[..., None]
+    texture = Texture()
+    texture.set_array(np.where(even, np.array([200, 100, 50], dtype=np.uint8), np.array([50, 100, 200], dtype=np.uint8)))
+    return texture
+
+def measure(fn, repeat, warmup=1, setup=None):
+    times = []
+    for k in range(warmup + repeat):
+        arg = setup() if setup else None
+        t = time.perf_counter()
+        fn(arg)
+        dt = time.perf_counter() - t
+        if k >= warmup: times.append(dt)
+    return summarize(times)
+
+def summarize(times):
+    t = np.asarray(times, dtype=float)
+    res = {'n': len(t), 'min': float(t.min()), 'mean': float(t.mean()), 'median': float(np.median(t))}
+    for p in PERCENTILES:
+        res[f'p{p}'] = float(np.percentile(t, p))
+    return res
+
+def bench_model(path, repeat, scales, width, height, workers, log):
+    name = os.path.splitext(os.path.basename(path))[0]
+    results = {}
+
+    def record(key, stats):
+        results[f"{name}/{key}"] = stats
+        log(f"{name}/{key}: {stats['median'] * 1000:.2f} мс")
+
+    record('load', measure(lambda _: load_obj(path), repeat))
+    poly = fit_to_view(load_obj(path))
+    M = matrix_rotate_y(0.6) @ matrix_rotate_x(0.4)
+    record('transform', measure(lambda p: p.apply_matrix(M), repeat, setup=poly.copy))
+    record('world', measure(lambda node: node.V, repeat, setup=lambda: SceneNode(poly, M)))
+    poly.apply_matrix(M)
+    record('classify', measure(lambda _: classify_faces_perspective(poly.V, poly.faces, 5.0), repeat))
+    lighting = Lighting(); lighting.light_pos = np.array([3.0, 2.0, 4.0])
+    renderer = OffscreenRenderer(width, height, lighting=lighting, texture=checker_texture(), workers=workers, scale=min(width, height) / 4.0)
+    try:
+        for scale in scales:
+            renderer.render_scale = scale
+            for shading in SHADING:
+                for tex in (False, True):
+                    renderer.shading_mode = shading; renderer.texture.use_texture = tex
+                    key = f"{shading}/{'tex' if tex else 'color'}/{scale:g}"
+
+                    def cold(_):
+                        renderer.frame_cache = None; renderer.render(poly)
+                    record(f"raster/{key}", measure(cold, repeat))
+                    record(f"shade/{key}", measure(lambda _: renderer.render(poly), repeat))
+    finally:
+        renderer.close()
+    return results
+
+def run(models, repeat=5, scales=(1.0, 0.5, 0.25), width=720, height=720, workers=1, log=print):
+    results = {}
+    for path in models:
+        results.update(bench_model(path, repeat, scales, width, height, workers, log))
+    meta = {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'time': time.strftime("%Y-%m-%dT%H:%M:%S"), 'repeat': repeat, 'width': width, 'height': height, 'workers': workers}
+    return {'meta': meta, 'results': results}
+
+def compare(report, baseline, threshold=0.15, min_delta=1e-3, stat='median'):
+    regressions = []
+    rows = []
+    for key, base in baseline['results'].items():
+        cur = report['results'].get(key)
+        if cur is None: continue
+        b, c = base[stat], cur[stat]
+        ratio = c / b if b > 0 else math.inf
+        bad = ratio > 1.0 + threshold and c - b > min_delta
+        rows.append((key, b, c, ratio, bad))
+        if bad: regressions.append(key)
+    return rows, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк рендера lab09 на OBJ-моделях (без окна)")
+    parser.add_argument("models", nargs="*", help="OBJ-файлы (по умолчанию lab14/model1-5 и lab13/objectOrbit)")
+    parser.add_argument("-o", "--output", default="bench.json", help="куда записать результаты JSON")
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 0.5, 0.25], help="значения render_scale")
+    parser.add_argument("--width", type=int, default=720)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--baseline", help="JSON предыдущего прогона для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.15, help="допустимое относительное замедление медианы")
+    parser.add_argument("--min-delta", type=float, default=1e-3, help="игнорировать замедления меньше, чем столько секунд")
+    args = parser.parse_args(argv)
+
+    report = run(args.models or MODELS, args.repeat, args.scales, args.width, args.height, args.workers)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    if not args.baseline: return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows, regressions = compare(report, baseline, args.threshold, args.min_delta)
+    for key, b, c, ratio, bad in rows:
+        print(f"{'РЕГРЕССИЯ ' if bad else ''}{key}: {b * 1000:.2f} -> {c * 1000:.2f} мс (x{ratio:.2f})")
+    if regressions:
+        print(f"Замедление больше {args.threshold:.0%}: {len(regressions)} из {len(rows)}")
+        return 1
+    print(f"Регрессий нет ({len(rows)} замеров)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
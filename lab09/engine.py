@@ -3,38 +3,98 @@ import numpy as np
 from PIL import Image
 
 class Face:
+    __slots__ = ('indices', 'tex_coords')
+
     def __init__(self, indices, tex_coords=None):
         self.indices = list(indices)
         self.tex_coords = tex_coords if tex_coords else []
 
+class FaceView:
+    __slots__ = ('_faces', '_i')
+
+    def __init__(self, faces, i):
+        self._faces = faces; self._i = i
+
+    @property
+    def indices(self):
+        fl = self._faces
+        return fl.indices[fl.offsets[self._i]:fl.offsets[self._i + 1]].tolist()
+
+    @property
+    def tex_coords(self):
+        fl = self._faces
+        if fl.uv_index is None: return []
+        ui = fl.uv_index[fl.offsets[self._i]:fl.offsets[self._i + 1]]
+        n = int(np.argmin(ui >= 0)) if (ui < 0).any() else len(ui)
+        return fl.uv[ui[:n]].tolist()
+
+class FaceList:
+    __slots__ = ('indices', 'offsets', 'uv', 'uv_index')
+
+    def __init__(self, indices, offsets, uv=None, uv_index=None):
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.uv = None if uv is None else np.asarray(uv, dtype=float).reshape(-1, 2)
+        self.uv_index = None if uv_index is None else np.asarray(uv_index, dtype=np.int32)
+
+    @classmethod
+    def from_faces(cls, faces):
+        idx = []; offsets = [0]; uv = []; uv_index = []
+        for f in faces:
+            fi = list(f.indices) if hasattr(f, 'indices') else list(f)
+            tc = (f.tex_coords if hasattr(f, 'tex_coords') else None) or []
+            idx.extend(fi); offsets.append(len(idx))
+            for k in range(len(fi)):
+                if k < len(tc):
+                    uv_index.append(len(uv)); uv.append(tc[k][:2])
+                else:
+                    uv_index.append(-1)
+        if not uv: return cls(idx, offsets)
+        return cls(idx, offsets, uv, uv_index)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice): return [FaceView(self, k) for k in range(*i.indices(len(self)))]
+        if i < 0: i += len(self)
+        if not 0 <= i < len(self): raise IndexError(i)
+        return FaceView(self, i)
+
+    def __iter__(self):
+        return (FaceView(self, i) for i in range(len(self)))
+
+    def sizes(self):
+        return np.diff(self.offsets)
+
+    def copy(self):
+        return FaceList(self.indices.copy(), self.offsets.copy(), None if self.uv is None else self.uv.copy(), None if self.uv_index is None else self.uv_index.copy())
+
+    def append(self, face):
+        other = FaceList.from_faces([face])
+        uv_index = self.uv_index if self.uv_index is not None else np.full(len(self.indices), -1, dtype=np.int32)
+        other_uv_index = other.uv_index if other.uv_index is not None else np.full(len(other.indices), -1, dtype=np.int32)
+        n_uv = 0 if self.uv is None else len(self.uv)
+        self.offsets = np.concatenate([self.offsets, self.offsets[-1] + other.offsets[1:]])
+        self.indices = np.concatenate([self.indices, other.indices])
+        if self.uv is not None or other.uv is not None:
+            self.uv = np.concatenate([u for u in (self.uv, other.uv) if u is not None])
+            self.uv_index = np.concatenate([uv_index, np.where(other_uv_index >= 0, other_uv_index + n_uv, -1).astype(np.int32)])
+
 class Polyhedron:
     def __init__(self, vertices: np.ndarray, faces: list, color="#5a9bd8", name="obj", vertex_normals=None, tex_coords=None):
         self.V = np.array(vertices, dtype=float)
-        self.faces = [Face(f.indices if hasattr(f, 'indices') else f, f.tex_coords if hasattr(f, 'tex_coords') else None) for f in faces]
+        self.faces = faces.copy() if isinstance(faces, FaceList) else FaceList.from_faces(faces)
         self.color = color
         self.name = name
+        self.topology_version = 0
+        self._tri_cache = None
         self.vertex_normals = vertex_normals if vertex_normals is not None else self._compute_vertex_normals()
         self.tex_coords = tex_coords if tex_coords is not None else self._compute_default_tex_coords()
+        self.version = 0
 
-    def _compute_vertex_normals(self):
-        normals = np.zeros_like(self.V)
-        for face in self.faces:
-            if len(face.indices) < 3:
-                continue
-            v0, v1, v2 = self.V[face.indices[0]], self.V[face.indices[1]], self.V[face.indices[2]]
-            normal = np.cross(v1 - v0, v2 - v0)
-            nrm = np.linalg.norm(normal)
-            if nrm > 0:
-                normal = normal / nrm
-            for idx in face.indices:
-                normals[idx] += normal
-        for i in range(len(normals)):
-            nrm = np.linalg.norm(normals[i])
-            if nrm > 0:
-                normals[i] = normals[i] / nrm
-            else:
-                normals[i] = np.array([0.0, 0.0, 1.0])
-        return normals
+    def _compute_vertex_normals(self, weighting='angle'):
+        return compute_vertex_normals(self.V, self.triangles()[0], weighting)
 
     def _compute_default_tex_coords(self):
         tex_coords = []
@@ -46,26 +106,128 @@ class Polyhedron:
         return np.array(tex_coords)
 
     def copy(self):
-        q = Polyhedron(self.V.copy(), [Face(f.indices[:], f.tex_coords[:] if f.tex_coords else None) for f in self.faces], color=self.color, name=self.name, vertex_normals=self.vertex_normals.copy() if self.vertex_normals is not None else None, tex_coords=self.tex_coords.copy() if self.tex_coords is not None else None)
+        q = Polyhedron(self.V.copy(), self.faces, color=self.color, name=self.name, vertex_normals=self.vertex_normals.copy() if self.vertex_normals is not None else None, tex_coords=self.tex_coords.copy() if self.tex_coords is not None else None)
+        if self._tri_cache is not None and self._tri_cache[0] is self.faces and self._tri_cache[1] == self._topology_key():
+            q._tri_cache = (q.faces, q._topology_key(), self._tri_cache[2])
         return q
 
+    def _topology_key(self):
+        return (len(self.faces), self.topology_version)
+
+    def invalidate_topology(self):
+        self.topology_version += 1
+
+    def triangles(self):
+        c = self._tri_cache
+        if c is None or c[0] is not self.faces or c[1] != self._topology_key():
+            c = self._tri_cache = (self.faces, self._topology_key(), triangulate_faces(self.faces))
+        return c[2]
+
     def center(self):
         return np.mean(self.V, axis=0)
 
     def apply_matrix(self, M: np.ndarray):
-        N = self.V.shape[0]
-        hom = np.hstack([self.V, np.ones((N, 1))])
-        transformed = (M @ hom.T).T
-        w = transformed[:, 3:4]
-        w[w == 0] = 1.0
-        self.V = transformed[:, :3] / w
+        self.version += 1
+        self.V = transform_points(self.V, M)
         if self.vertex_normals is not None:
-            rot_matrix = M[:3, :3]
-            for i in range(len(self.vertex_normals)):
-                self.vertex_normals[i] = rot_matrix @ self.vertex_normals[i]
-                nrm = np.linalg.norm(self.vertex_normals[i])
-                if nrm > 0:
-                    self.vertex_normals[i] /= nrm
+            self.vertex_normals = normalize_rows(self.vertex_normals @ normal_matrix(M).T)
+
+class SceneNode:
+    def __init__(self, mesh, model=None):
+        self.mesh = mesh
+        self.model = np.eye(4) if model is None else np.array(model, dtype=float)
+        self.model_version = 0
+        self._world = None
+        self._local_center = None
+
+    @property
+    def version(self):
+        return (self.model_version, self.mesh.version)
+
+    @property
+    def faces(self): return self.mesh.faces
+
+    @property
+    def tex_coords(self): return self.mesh.tex_coords
+
+    @property
+    def color(self): return self.mesh.color
+
+    @color.setter
+    def color(self, value): self.mesh.color = value
+
+    @property
+    def name(self): return self.mesh.name
+
+    @name.setter
+    def name(self, value): self.mesh.name = value
+
+    def triangles(self):
+        return self.mesh.triangles()
+
+    def copy(self):
+        return SceneNode(self.mesh, self.model)
+
+    def apply_matrix(self, M: np.ndarray):
+        self.model = np.asarray(M, dtype=float) @ self.model
+        self.model_version += 1
+
+    def set_matrix(self, M: np.ndarray):
+        self.model = np.array(M, dtype=float)
+        self.model_version += 1
+
+    def _evaluate(self):
+        key = (self.mesh, self.version)
+        c = self._world
+        if c is None or c[0] != key:
+            mesh = self.mesh
+            V = transform_points(mesh.V, self.model)
+            normals = normalize_rows(mesh.vertex_normals @ normal_matrix(self.model).T) if mesh.vertex_normals is not None else None
+            for a in (V, normals):
+                if a is not None: a.flags.writeable = False
+            c = self._world = (key, V, normals)
+        return c
+
+    @property
+    def V(self): return self._evaluate()[1]
+
+    @property
+    def vertex_normals(self): return self._evaluate()[2]
+
+    def center(self):
+        M = self.model
+        if M[3, 0] or M[3, 1] or M[3, 2] or M[3, 3] != 1.0: return np.mean(self.V, axis=0)
+        c = self._local_center
+        if c is None or c[0] != (self.mesh, self.mesh.version):
+            c = self._local_center = ((self.mesh, self.mesh.version), self.mesh.center())
+        return M[:3, :3] @ c[1] + M[:3, 3]
+
+def transform_points(V, M):
+    hom = np.hstack([V, np.ones((V.shape[0], 1))])
+    transformed = (M @ hom.T).T
+    w = transformed[:, 3:4]
+    w[w == 0] = 1.0
+    return transformed[:, :3] / w
+
+def triangulate_faces(faces):
+    if not isinstance(faces, FaceList): faces = FaceList.from_faces(faces)
+    sizes = faces.sizes()
+    counts = np.maximum(sizes - 2, 0)
+    tri_face = np.repeat(np.arange(len(faces), dtype=np.int32), counts)
+    start = np.repeat(faces.offsets[:-1], counts)
+    fan = np.arange(len(start)) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+    corner = np.stack([start, start + fan, start + fan + 1], axis=1)
+    tris = faces.indices[corner].reshape(-1, 3)
+    if faces.uv_index is None:
+        uvs = np.zeros((len(tris), 3, 2), dtype=np.float32)
+        has_uv = np.zeros(len(tris), dtype=bool)
+    else:
+        first_missing = np.minimum.reduceat(np.append(faces.uv_index, 0), faces.offsets[:-1]) if len(faces) else np.zeros(0, dtype=np.int32)
+        has_uv = np.repeat(first_missing >= 0, counts)
+        ui = faces.uv_index[corner].reshape(-1, 3)
+        uvs = np.where(has_uv[:, None, None], faces.uv.astype(np.float32)[np.maximum(ui, 0)], np.float32(0.0))
+    for a in (tris, uvs, has_uv, tri_face): a.flags.writeable = False
+    return tris, uvs, has_uv, tri_face
 
 def matrix_translate(tx, ty, tz):
     M = np.eye(4)
@@ -244,6 +406,103 @@ def make_dodecahedron(color="#5a9bd8"):
         poly_faces.append(poly_face)
     return Polyhedron(centers, poly_faces, color=color, name="Додекаэдр")
 
+def load_obj(path):
+    verts = []; tex_coords = []; normals = []
+    face_idx = []; face_uv = []; face_norm = []; offsets = [0]
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            s = line.strip()
+            if not s or s.startswith("#"): continue
+            parts = s.split(); tag = parts[0].lower()
+            if tag == "v" and len(parts) >= 4:
+                x = float(parts[1]); y = float(parts[2]); z = float(parts[3])
+                verts.append([x, y, z])
+            elif tag == "vt" and len(parts) >= 3:
+                u = float(parts[1]); v = float(parts[2])
+                tex_coords.append([u, v])
+            elif tag == "vn" and len(parts) >= 4:
+                x = float(parts[1]); y = float(parts[2]); z = float(parts[3])
+                normals.append([x, y, z])
+            elif tag == "f" and len(parts) >= 4:
+                idxs = []; tex_idxs = []; norm_idxs = []
+                for tok in parts[1:]:
+                    if "/" in tok:
+                        parts_vert = tok.split("/")
+                        vert_idx = parts_vert[0]
+                        tex_idx = parts_vert[1] if len(parts_vert) > 1 and parts_vert[1] else "0"
+                        norm_idx = parts_vert[2] if len(parts_vert) > 2 and parts_vert[2] else "0"
+                    else:
+                        vert_idx = tok; tex_idx = "0"; norm_idx = "0"
+                    if vert_idx == "" or vert_idx == "0": continue
+                    i_vert = int(vert_idx)
+                    if i_vert < 0: i_vert = len(verts) + 1 + i_vert
+                    idxs.append(i_vert - 1)
+                    if tex_idx != "0" and tex_idx != "":
+                        i_tex = int(tex_idx)
+                        if i_tex < 0: i_tex = len(tex_coords) + 1 + i_tex
+                        tex_idxs.append(i_tex - 1)
+                    else:
+                        tex_idxs.append(0)
+                    if norm_idx != "0" and norm_idx != "":
+                        i_norm = int(norm_idx)
+                        if i_norm < 0: i_norm = len(normals) + 1 + i_norm
+                        norm_idxs.append(i_norm - 1)
+                    else:
+                        norm_idxs.append(-1)
+                if len(idxs) >= 3:
+                    face_idx.extend(idxs); face_uv.extend(tex_idxs); face_norm.extend(norm_idxs); offsets.append(len(face_idx))
+    if len(verts) == 0 or len(offsets) == 1:
+        raise ValueError("Пустая модель или отсутствуют грани")
+    n_tex = len(tex_coords)
+    uv_index = np.array(face_uv, dtype=np.int64)
+    uv_index = np.where(uv_index < 0, uv_index + n_tex, uv_index)
+    uv_index = np.where((uv_index >= 0) & (uv_index < n_tex), uv_index, n_tex)
+    faces = FaceList(face_idx, offsets, np.array(tex_coords + [[0.0, 0.0]], dtype=float), uv_index)
+    tex_coords_array = None
+    if tex_coords and len(tex_coords) > 0:
+        tex_coords_array = np.array(tex_coords, dtype=float)
+    poly = Polyhedron(np.array(verts, dtype=float), faces, tex_coords=tex_coords_array)
+    norm_index = np.array(face_norm, dtype=np.int64)
+    has_normal = (norm_index >= 0) & (norm_index < len(normals))
+    if has_normal.any():
+        acc = np.zeros_like(poly.V); count = np.zeros(len(poly.V), dtype=np.int64)
+        vi = faces.indices[has_normal]
+        np.add.at(acc, vi, np.array(normals, dtype=float)[norm_index[has_normal]])
+        np.add.at(count, vi, 1)
+        covered = count > 0
+        poly.vertex_normals[covered] = normalize_rows(acc[covered])
+    return poly
+
+def save_obj(path, poly: Polyhedron):
+    with open(path, "w", encoding="utf-8") as f:
+        for v in poly.V:
+            f.write(f"v {v[0]} {v[1]} {v[2]}\n")
+        if poly.tex_coords is not None:
+            for tc in poly.tex_coords:
+                f.write(f"vt {tc[0]} {tc[1]}\n")
+        if poly.vertex_normals is not None:
+            for vn in poly.vertex_normals:
+                f.write(f"vn {vn[0]} {vn[1]} {vn[2]}\n")
+        for face in poly.faces:
+            idxs = []
+            for i, idx in enumerate(face.indices):
+                vert_idx = str(idx + 1)
+                tex_idx = ""
+                norm_idx = ""
+                if face.tex_coords and i < len(face.tex_coords):
+                    tex_idx = str(i + 1)
+                if poly.vertex_normals is not None:
+                    norm_idx = str(idx + 1)
+                if tex_idx and norm_idx:
+                    idxs.append(f"{vert_idx}/{tex_idx}/{norm_idx}")
+                elif tex_idx:
+                    idxs.append(f"{vert_idx}/{tex_idx}")
+                elif norm_idx:
+                    idxs.append(f"{vert_idx}//{norm_idx}")
+                else:
+                    idxs.append(vert_idx)
+            f.write("f " + " ".join(idxs) + "\n")
+
 def compute_face_normal_basic(V, idxs):
     if len(idxs) < 3: return np.array([0.0, 0.0, 0.0])
     v0, v1, v2 = V[idxs[0]], V[idxs[1]], V[idxs[2]]
@@ -260,6 +519,88 @@ def compute_face_normal_outward(V, idxs, obj_center):
     if np.dot(n, dir_out) < 0: n = -n
     return n
 
+def classify_faces_perspective(V_world, faces, camera_distance=5.0):
+    cam_pos = np.array([0.0, 0.0, camera_distance])
+    obj_center = np.mean(V_world, axis=0)
+    front, back = [], []
+    for f in faces:
+        idx = np.array(f.indices)
+        centroid = np.mean(V_world[idx], axis=0)
+        n = compute_face_normal_outward(V_world, f.indices, obj_center)
+        if np.allclose(n, 0.0): continue
+        view_vec = cam_pos - centroid
+        if np.dot(n, view_vec) > 0:
+            front.append(f)
+        else:
+            back.append(f)
+    return front, back
+
+def classify_faces_isometric(V_iso, faces, look_vec):
+    obj_center_iso = np.mean(V_iso, axis=0)
+    front, back = [], []
+    for f in faces:
+        n = compute_face_normal_outward(V_iso, f.indices, obj_center_iso)
+        if np.allclose(n, 0.0): continue
+        if np.dot(n, look_vec) < 0:
+            front.append(f)
+        else:
+            back.append(f)
+    return front, back
+
+def classify_faces_camera(V_eye, faces):
+    obj_center_eye = np.mean(V_eye, axis=0)
+    front, back = [], []
+    for f in faces:
+        idx = np.array(f.indices)
+        centroid_eye = np.mean(V_eye[idx], axis=0)
+        n_eye = compute_face_normal_outward(V_eye, f.indices, obj_center_eye)
+        if np.allclose(n_eye, 0.0): continue
+        view_vec = -centroid_eye
+        if np.dot(n_eye, view_vec) > 0:
+            front.append(f)
+        else:
+            back.append(f)
+    return front, back
+
+def normal_matrix(M):
+    A = np.asarray(M, dtype=float)[:3, :3]
+    C = np.array([np.cross(A[1], A[2]), np.cross(A[2], A[0]), np.cross(A[0], A[1])])
+    return -C if np.linalg.det(A) < 0 else C
+
+def row_dot(a, b):
+    return (a[:, None, :] @ b[:, :, None])[:, 0, 0]
+
+def row_norm(a):
+    return np.sqrt(row_dot(a, a))
+
+def normalize_rows(a):
+    nrm = row_norm(a)
+    return np.divide(a, nrm[:, None], out=a.copy(), where=nrm[:, None] > 0)
+
+def compute_vertex_normals(V, tris, weighting='angle'):
+    V = np.asarray(V, dtype=float)
+    tris = np.asarray(tris).reshape(-1, 3)
+    normals = np.zeros_like(V)
+    if len(tris):
+        p = V[tris]
+        fn = np.cross(p[:, 1] - p[:, 0], p[:, 2] - p[:, 0])
+        if weighting == 'area':
+            w = np.repeat(fn, 3, axis=0)
+        elif weighting == 'angle':
+            e1 = (np.roll(p, -1, axis=1) - p).reshape(-1, 3)
+            e2 = (np.roll(p, -2, axis=1) - p).reshape(-1, 3)
+            ang = np.arctan2(row_norm(np.cross(e1, e2)), row_dot(e1, e2))
+            w = np.repeat(normalize_rows(fn), 3, axis=0) * ang[:, None]
+        elif weighting == 'uniform':
+            w = np.repeat(normalize_rows(fn), 3, axis=0)
+        else:
+            raise ValueError(f"Неизвестный способ взвешивания нормалей: {weighting}")
+        np.add.at(normals, tris.ravel(), w)
+    nrm = row_norm(normals)
+    normals = np.divide(normals, nrm[:, None], out=normals, where=nrm[:, None] > 0)
+    normals[nrm == 0] = (0.0, 0.0, 1.0)
+    return normals
+
 def look_at(camera_pos, target, up=np.array([0, 1, 0], dtype=float)):
     f = target - camera_pos
     fn = f / (np.linalg.norm(f) + 1e-12)
@@ -301,22 +642,82 @@ class Lighting:
         ambient = self.ambient_intensity
         final_intensity = ambient + self.diffuse_intensity * diffuse + specular
         return np.clip(final_intensity, 0.0, 1.0)
-        
+
+    def _light_positions(self, light_positions):
+        if light_positions is None:
+            return self.light_pos[None, :]
+        return np.asarray(light_positions, dtype=float).reshape(-1, 3)
+
+    def lambert_shading_batch(self, normals, light_positions=None):
+        normals = np.asarray(normals, dtype=float)
+        final_intensity = np.full(len(normals), self.ambient_intensity)
+        for light_dir in self._light_positions(light_positions):
+            light_dir = light_dir / np.linalg.norm(light_dir)
+            diffuse = np.maximum(row_dot(normals, np.broadcast_to(light_dir, normals.shape)), 0.0)
+            final_intensity = final_intensity + self.diffuse_intensity * diffuse
+        return np.clip(final_intensity, 0.0, 1.0)
+
+    def phong_shading_batch(self, normals, view_dirs, positions, light_positions=None):
+        normals = np.asarray(normals, dtype=float)
+        view_dirs = np.broadcast_to(view_dirs, normals.shape)
+        positions = np.broadcast_to(positions, normals.shape)
+        final_intensity = np.full(len(normals), self.ambient_intensity)
+        for light_pos in self._light_positions(light_positions):
+            light_dir = light_pos - positions
+            light_dir = light_dir / row_norm(light_dir)[:, None]
+            nl = row_dot(normals, light_dir)
+            diffuse = np.maximum(nl, 0.0)
+            reflect_dir = (2 * nl)[:, None] * normals - light_dir
+            reflect_dir = reflect_dir / (row_norm(reflect_dir) + 1e-12)[:, None]
+            specular = np.maximum(row_dot(view_dirs, reflect_dir), 0.0)
+            specular = self.specular_intensity * np.float_power(specular, self.shininess)
+            final_intensity = final_intensity + self.diffuse_intensity * diffuse + specular
+        return np.clip(final_intensity, 0.0, 1.0)
+
+def build_mipmaps(texels):
+    levels = [texels]
+    while levels[-1].shape[0] > 1 or levels[-1].shape[1] > 1:
+        a = levels[-1].astype(np.float32)
+        if a.shape[0] % 2: a = np.concatenate([a, a[-1:]], axis=0)
+        if a.shape[1] % 2: a = np.concatenate([a, a[:, -1:]], axis=1)
+        a = (a[0::2, 0::2] + a[1::2, 0::2] + a[0::2, 1::2] + a[1::2, 1::2]) * 0.25
+        levels.append(np.ascontiguousarray(np.clip(a + 0.5, 0, 255).astype(np.uint8)))
+    return levels
+
+def _sample_bilinear(texels, u, v):
+    h, w = texels.shape[:2]
+    x = np.clip(u * (w - 1), 0, w - 1); y = np.clip((1 - v) * (h - 1), 0, h - 1)
+    x0 = np.floor(x).astype(np.int64); y0 = np.floor(y).astype(np.int64)
+    x1 = np.minimum(x0 + 1, w - 1); y1 = np.minimum(y0 + 1, h - 1)
+    fx = (x - x0)[:, None]; fy = (y - y0)[:, None]
+    top = texels[y0, x0] * (1 - fx) + texels[y0, x1] * fx
+    bottom = texels[y1, x0] * (1 - fx) + texels[y1, x1] * fx
+    return top * (1 - fy) + bottom * fy
+
 class Texture:
     def __init__(self):
         self.texture_image = None
-        self.texture_data = None
+        self.texture_array = None
+        self.mipmaps = []
         self.texture_width = 0
         self.texture_height = 0
+        self.filter = 'nearest'
         self.use_texture = False
 
+    def set_array(self, texels, mipmaps=None):
+        self.texture_array = np.ascontiguousarray(texels, dtype=np.uint8)
+        self.texture_height, self.texture_width = self.texture_array.shape[:2]
+        self.mipmaps = mipmaps if mipmaps is not None else build_mipmaps(self.texture_array)
+
+    def set_image(self, image):
+        self.texture_image = image
+        self.set_array(np.asarray(image.convert("RGB")))
+        self.use_texture = True
+
     def load_texture(self, path):
         try:
             image = Image.open(path)
-            self.texture_image = image
-            self.texture_data = image.convert("RGB").load()
-            self.texture_width, self.texture_height = image.size
-            self.use_texture = True
+            self.set_image(image)
             return True
         except Exception as e:
             print(f"Error loading texture: {e}")
@@ -324,10 +725,36 @@ class Texture:
             return False
 
     def get_color(self, u, v):
-        if not self.use_texture or self.texture_data is None:
+        if not self.use_texture or self.texture_array is None:
             return (255, 255, 255)
         x = int(u * (self.texture_width - 1))
         y = int((1 - v) * (self.texture_height - 1))
         x = max(0, min(x, self.texture_width - 1))
         y = max(0, min(y, self.texture_height - 1))
-        return self.texture_data[x, y]
+        return tuple(int(c) for c in self.texture_array[y, x])
+
+    def sample(self, u, v, mode=None, lod=None):
+        if not self.use_texture or self.texture_array is None:
+            return np.full((len(u), 3), 255, dtype=np.uint8)
+        mode = mode or self.filter
+        if mode == 'bilinear':
+            out = _sample_bilinear(self.texture_array, u, v)
+        elif mode == 'trilinear' and lod is not None and len(self.mipmaps) > 1:
+            lod = np.clip(lod, 0, len(self.mipmaps) - 1)
+            base = np.minimum(np.floor(lod).astype(np.int64), len(self.mipmaps) - 2)
+            t = (lod - base)[:, None]
+            out = np.empty((len(u), 3))
+            for level in np.unique(base):
+                sel = np.flatnonzero(base == level)
+                c0 = _sample_bilinear(self.mipmaps[level], u[sel], v[sel])
+                c1 = _sample_bilinear(self.mipmaps[level + 1], u[sel], v[sel])
+                out[sel] = c0 * (1 - t[sel]) + c1 * t[sel]
+        elif mode == 'trilinear':
+            out = _sample_bilinear(self.texture_array, u, v)
+        else:
+            x = (u * (self.texture_width - 1)).astype(np.int64)
+            y = ((1 - v) * (self.texture_height - 1)).astype(np.int64)
+            x = np.clip(x, 0, self.texture_width - 1)
+            y = np.clip(y, 0, self.texture_height - 1)
+            return self.texture_array[y, x]
+        return np.clip(out + 0.5, 0, 255).astype(np.uint8)
@@ -0,0 +1,269 @@
+import argparse
+import math
+from functools import partial
+import numpy as np
+from PIL import Image
+from engine import (
+    Lighting, Texture, load_obj, look_at, matrix_scale, matrix_translate,
+    project_perspective, project_orthographic, isometric_rotation_matrix
+)
+from raster import (
+    FrameBuffer, RasterStats, clip_triangles, cull_triangles, frustum_planes,
+    rasterize_mesh, rasterize_triangle, rasterize_triangle_scalar, resolve_gbuffer
+)
+from parallel import ParallelRasterizer
+
+def color_to_rgb(color):
+    if isinstance(color, str) and color.startswith("#"):
+        return (int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16))
+    return (90, 155, 216)
+
+def fit_to_view(poly, radius=1.5):
+    c = poly.center()
+    poly.apply_matrix(matrix_translate(-c[0], -c[1], -c[2]))
+    r = np.max(np.linalg.norm(poly.V, axis=1))
+    if r > 0: poly.apply_matrix(matrix_scale(radius / r, radius / r, radius / r))
+    return poly
+
+class Camera:
+    def __init__(self, position=(0.0, 0.0, 6.0), target=(0.0, 0.0, 0.0), up=(0.0, 1.0, 0.0), fov_deg=60.0):
+        self.position = np.array(position, dtype=float)
+        self.target = np.array(target, dtype=float)
+        self.up = np.array(up, dtype=float)
+        self.fov_deg = fov_deg
+
+    def focal(self):
+        return 1.0 / math.tan(math.radians(self.fov_deg) * 0.5)
+
+    def key(self):
+        return (tuple(self.position), tuple(self.target), tuple(self.up), self.fov_deg)
+
+class OffscreenRenderer:
+    def __init__(self, width=720, height=720, shading_mode='none', lighting=None, texture=None, backend='mesh', workers=1, scale=180.0, render_scale=1.0):
+        self.width = width
+        self.height = height
+        self.shading_mode = shading_mode
+        self.lighting = lighting if lighting is not None else Lighting()
+        self.texture = texture if texture is not None else Texture()
+        self.backend = backend
+        self.workers = workers
+        self.scale = scale
+        self.render_scale = render_scale
+        self.projection_mode = 'perspective'
+        self.camera_distance = 5.0
+        self.cull_enabled = False
+        self.hiz_enabled = True
+        self.near_plane = 1e-6
+        self.far_plane = 1000.0
+        self.guard_band = 4.0
+        self.pool = None
+        self.framebuffer = None
+        self.framebuffer_owner = None
+        self.frame_cache = None
+        self.vertex_light_cache = None
+        self.stats = None
+
+    def set_workers(self, workers):
+        self.workers = workers
+        if self.pool is not None and self.pool.workers != workers:
+            self.pool.close()
+            self.pool = None
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+        self.framebuffer = None; self.framebuffer_owner = None
+        self.frame_cache = None
+
+    def render(self, poly, camera=None):
+        if not self._relight_cached(poly, camera):
+            self.frame_cache = None
+            self.stats = None
+            if camera is not None:
+                self._render_camera(poly, camera)
+            else:
+                self._render_projection(poly)
+        return self.framebuffer.rgb, self.framebuffer.gbuf.depth
+
+    def clip_planes(self, focal, eye_z, Wr, Hr, scale_r):
+        return frustum_planes(focal, eye_z, self.near_plane, self.guard_band * Wr / (2.0 * scale_r), self.guard_band * Hr / (2.0 * scale_r))
+
+    def _parallel_enabled(self):
+        return self.backend == 'mesh' and self.workers > 1
+
+    def _target(self):
+        s = self.render_scale
+        return max(1, int(self.width * s)), max(1, int(self.height * s)), self.scale * s
+
+    def _alloc_buffers(self, Hr, Wr):
+        owner = None
+        if self._parallel_enabled():
+            if self.pool is None:
+                self.pool = ParallelRasterizer(self.workers)
+            owner = self.pool
+        fb = self.framebuffer
+        if fb is None or (fb.height, fb.width) != (Hr, Wr) or self.framebuffer_owner is not owner:
+            fb = FrameBuffer(Hr, Wr, *(owner.framebuffers(Hr, Wr) if owner is not None else ()))
+            self.framebuffer = fb; self.framebuffer_owner = owner
+        fb.clear()
+        return fb.gbuf, fb.rgb
+
+    def _vertex_intensities(self, poly):
+        if self.shading_mode != 'gouraud' or poly.vertex_normals is None: return None
+        L = self.lighting
+        key = (poly, poly.version, tuple(L.light_pos), L.ambient_intensity, L.diffuse_intensity)
+        if self.vertex_light_cache is None or self.vertex_light_cache[0] != key:
+            self.vertex_light_cache = (key, L.lambert_shading_batch(poly.vertex_normals))
+        return self.vertex_light_cache[1]
+
+    def _geometry_key(self, poly, camera):
+        key = (poly, poly.version, self.cull_enabled, self.width, self.height, self.render_scale, self.scale, self.backend, self.workers)
+        if camera is not None:
+            return key + ('camera',) + camera.key()
+        return key + (self.projection_mode, self.camera_distance)
+
+    def _relight_cached(self, poly, camera):
+        fc = self.frame_cache
+        if fc is None or self.backend != 'mesh' or fc['key'] != self._geometry_key(poly, camera):
+            return False
+        positions = fc['positions'] if self.shading_mode == 'phong' else None
+        intensities = self._vertex_intensities(poly)
+        if fc['clip'] is not None: intensities = fc['clip'].extend(intensities)
+        resolve_gbuffer(fc['gbuf'], fc['rgb'], self.shading_mode, self.lighting, self.texture, fc['tris'], color_to_rgb(poly.color),
+                        fc['tri_uv'], fc['has_uv'], fc['normals'], positions, fc['flat_position'], screen=fc['screen'],
+                        intensities=intensities)
+        return True
+
+    def _render_projection(self, poly):
+        Wr, Hr, scale_r = self._target()
+        gbuf, rgb = self._alloc_buffers(Hr, Wr)
+        d = self.camera_distance
+        V = poly.V.copy()
+        tris, tri_uv, has_uv, _ = poly.triangles()
+        self.stats = RasterStats()
+        clip = None
+        if self.projection_mode == 'perspective':
+            clip = clip_triangles(V, tris, self.clip_planes(d, d, Wr, Hr, scale_r), self.stats)
+            V = clip.extend(V)
+            pts2 = project_perspective(V, camera_distance=d)
+            depth = (d - V[:, 2])
+        else:
+            R = isometric_rotation_matrix()
+            V = (R @ V.T).T
+            pts2 = project_orthographic(V)
+            depth = (-V[:, 2])
+        sx_all = (pts2[:, 0] * scale_r + Wr / 2.0).astype(np.float32)
+        sy_all = (pts2[:, 1] * scale_r + Hr / 2.0).astype(np.float32)
+        self._rasterize_scene(poly, None, gbuf, rgb, sx_all, sy_all, depth, V, tris, tri_uv, has_uv, clip)
+
+    def _render_camera(self, poly, camera):
+        Wr, Hr, scale_r = self._target()
+        gbuf, rgb = self._alloc_buffers(Hr, Wr)
+        f = camera.focal()
+        Vview = look_at(camera.position, camera.target, camera.up)
+        V = poly.V
+        hom = np.hstack([V, np.ones((V.shape[0], 1))])
+        eye = (Vview @ hom.T).T[:, :3]
+        if not np.any(eye[:, 2] < -self.near_plane): return
+        tris, tri_uv, has_uv, _ = poly.triangles()
+        self.stats = RasterStats()
+        clip = clip_triangles(eye, tris, self.clip_planes(f, 0.0, Wr, Hr, scale_r), self.stats)
+        eye = clip.extend(eye)
+        ze = eye[:, 2]
+        xproj = (eye[:, 0] * f) / (-ze + 1e-12)
+        yproj = (eye[:, 1] * f) / (-ze + 1e-12)
+        sx_all = (xproj * scale_r + Wr / 2.0).astype(np.float32)
+        sy_all = (yproj * scale_r + Hr / 2.0).astype(np.float32)
+        self._rasterize_scene(poly, camera, gbuf, rgb, sx_all, sy_all, -ze, eye, tris, tri_uv, has_uv, clip)
+
+    def _rasterize_scene(self, poly, camera, gbuf, rgb, sx_all, sy_all, depth, P, tris, tri_uv, has_uv, clip):
+        Hr, Wr = gbuf.depth.shape
+        flat_position = camera is not None
+        base_color = color_to_rgb(poly.color)
+        normals = poly.vertex_normals
+        vertex_light = self._vertex_intensities(poly)
+        if clip is not None:
+            normals = clip.extend(normals); vertex_light = clip.extend(vertex_light)
+            tris, tri_uv, has_uv = clip.triangles(len(poly.V)), clip.corners(tri_uv), clip.faces(has_uv)
+        far = self.far_plane if clip is not None else None
+        keep = cull_triangles(sx_all, sy_all, depth, tris, Wr, Hr, far, self.cull_enabled, self.stats)
+        self.stats.track(int(np.count_nonzero(keep)))
+        positions = P if self.shading_mode == 'phong' else None
+        if self.backend == 'mesh':
+            tris = tris[keep]; tri_uv = tri_uv[keep]; has_uv = has_uv[keep]
+            rasterize = self.pool.rasterize_mesh if self._parallel_enabled() else rasterize_mesh
+            rasterize(gbuf.depth, rgb, self.shading_mode, self.lighting, self.texture, sx_all, sy_all, depth.astype(np.float32), tris, base_color, tri_uv, has_uv, normals, positions,
+                      flat_position=flat_position, gbuf=gbuf, intensities=vertex_light, hiz=self.hiz_enabled, stats=self.stats)
+            self.frame_cache = {'key': self._geometry_key(poly, camera), 'gbuf': gbuf, 'rgb': rgb, 'screen': (sx_all, sy_all),
+                                'tris': tris, 'tri_uv': tri_uv, 'has_uv': has_uv, 'normals': normals, 'positions': P, 'flat_position': flat_position, 'clip': clip}
+            return
+        kernel = rasterize_triangle if self.backend == 'numpy' else rasterize_triangle_scalar
+        tri_rasterize = partial(kernel, gbuf.depth, rgb, self.shading_mode, self.lighting, self.texture, flat_position=flat_position)
+        sel = np.flatnonzero(keep)
+        corners = tris[sel]
+        tri_sx, tri_sy, tri_z = sx_all[corners], sy_all[corners], depth[corners].astype(np.float32)
+        tri_n = None if normals is None else normals[corners]
+        tri_p = None if positions is None else positions[corners]
+        tri_i = None if vertex_light is None else vertex_light[corners]
+        tri_tc = tri_uv[sel].tolist(); tri_has = has_uv[sel]
+        for k in range(len(sel)):
+            tri_rasterize(tri_sx[k], tri_sy[k], tri_z[k], base_color, tri_tc[k] if tri_has[k] else None,
+                          None if tri_n is None else tri_n[k], None if tri_p is None else tri_p[k], intensities=None if tri_i is None else tri_i[k])
+
+def save_depth(path, depth):
+    finite = np.isfinite(depth)
+    img = np.zeros(depth.shape, dtype=np.uint8)
+    if finite.any():
+        lo = depth[finite].min(); hi = depth[finite].max()
+        img[finite] = (255 - (depth[finite] - lo) / max(hi - lo, 1e-12) * 200).astype(np.uint8)
+    Image.fromarray(img).save(path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Рендер OBJ-модели в PNG без окна (Z-буфер lab09)")
+    parser.add_argument("model", help="путь к OBJ-файлу")
+    parser.add_argument("-o", "--output", default="render.png", help="выходной PNG")
+    parser.add_argument("--width", type=int, default=720)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--scale", type=float, default=None, help="пикселей на единицу сцены (по умолчанию min(width, height) / 4)")
+    parser.add_argument("--shading", choices=["none", "gouraud", "phong"], default="gouraud")
+    parser.add_argument("--projection", choices=["perspective", "isometric"], default="perspective")
+    parser.add_argument("--distance", type=float, default=5.0, help="расстояние до камеры в режиме проекции")
+    parser.add_argument("--camera", type=float, nargs=3, metavar=("X", "Y", "Z"), help="позиция камеры (включает режим камеры)")
+    parser.add_argument("--target", type=float, nargs=3, metavar=("X", "Y", "Z"), default=(0.0, 0.0, 0.0))
+    parser.add_argument("--fov", type=float, default=60.0)
+    parser.add_argument("--light", type=float, nargs=3, metavar=("X", "Y", "Z"))
+    parser.add_argument("--texture", help="изображение текстуры")
+    parser.add_argument("--filter", choices=["nearest", "bilinear", "trilinear"], default="nearest")
+    parser.add_argument("--color", default="#5a9bd8")
+    parser.add_argument("--backend", choices=["mesh", "numpy", "python"], default="mesh")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--cull", action="store_true", help="отсекать нелицевые грани")
+    parser.add_argument("--no-fit", action="store_true", help="не центрировать и не масштабировать модель")
+    parser.add_argument("--depth", help="сохранить карту глубины в PNG")
+    args = parser.parse_args(argv)
+
+    poly = load_obj(args.model)
+    poly.color = args.color
+    if not args.no_fit: fit_to_view(poly)
+    texture = Texture()
+    if args.texture and not texture.load_texture(args.texture):
+        parser.error(f"не удалось загрузить текстуру {args.texture}")
+    texture.filter = args.filter
+    lighting = Lighting()
+    if args.light: lighting.light_pos = np.array(args.light, dtype=float)
+    scale = args.scale if args.scale is not None else min(args.width, args.height) / 4.0
+    renderer = OffscreenRenderer(args.width, args.height, args.shading, lighting, texture, args.backend, args.workers, scale)
+    renderer.projection_mode = args.projection
+    renderer.camera_distance = args.distance
+    renderer.cull_enabled = args.cull
+    camera = Camera(args.camera, args.target, fov_deg=args.fov) if args.camera else None
+    try:
+        rgb, depth = renderer.render(poly, camera)
+        Image.fromarray(rgb).save(args.output)
+        if args.depth: save_depth(args.depth, depth)
+    finally:
+        renderer.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from engine import Texture
+from raster import GBuffer, RasterStats, rasterize_mesh
+
+_shm = {}
+_frame = {}
+
+def _attach(name, keep):
+    for old in [n for n in _shm if n not in keep]:
+        _frame.clear()
+        _shm.pop(old).close()
+    if name not in _shm:
+        _shm[name] = shared_memory.SharedMemory(name=name)
+    return _shm[name]
+
+def _frame_arrays(desc, keep):
+    if _frame.get('id') != desc['frame']:
+        _frame.clear()
+        shm = _attach(desc['block'], keep)
+        _frame['arrays'] = {k: np.ndarray(shape, dtype=dt, buffer=shm.buf, offset=off) for k, (off, shape, dt) in desc['fields'].items()}
+        _frame['id'] = desc['frame']
+    return _frame['arrays']
+
+def _render_region(desc, region):
+    zname, idname, baryname, rgbname, H, W, zdtype = desc['fb']
+    keep = (zname, idname, baryname, rgbname, desc['block'])
+    gbuf = GBuffer(H, W, depth=np.ndarray((H, W), dtype=zdtype, buffer=_attach(zname, keep).buf),
+                   tri_id=np.ndarray((H, W), dtype=np.int32, buffer=_attach(idname, keep).buf),
+                   bary=np.ndarray((H, W, 2), dtype=np.float32, buffer=_attach(baryname, keep).buf))
+    rgb = np.ndarray((H, W, 3), dtype=np.uint8, buffer=_attach(rgbname, keep).buf)
+    a = _frame_arrays(desc, keep)
+    p = desc['params']
+    texture = Texture()
+    texture.use_texture = p['use_texture']
+    texture.filter = p['filter']
+    if 'texels' in a:
+        mips = [a['texels']] + [a[f'mip{i}'] for i in range(1, p['mip_levels'])]
+        texture.set_array(a['texels'], mips)
+    stats = RasterStats(len(a['tris'])) if p['stats'] else None
+    rasterize_mesh(gbuf.depth, rgb, p['shading_mode'], p['lighting'], texture, a['sx'], a['sy'], a['depth'], a['tris'], p['color'],
+                   a.get('tri_uv'), a.get('has_uv'), a.get('normals'), a.get('positions'), p['flat_position'], p['tile_size'], region, gbuf, a.get('intensities'), p['hiz'], stats)
+    return stats
+
+class _Segment:
+    def __init__(self, size):
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.name = self.shm.name
+        self.__array_interface__ = {'shape': (size,), 'typestr': '|u1', 'version': 3, 'data': (np.frombuffer(self.shm.buf, np.uint8, size).ctypes.data, False)}
+
+    def view(self, shape, dtype):
+        return np.asarray(self).view(dtype).reshape(shape)
+
+    def __del__(self):
+        self.shm.close()
+
+class ParallelRasterizer:
+    def __init__(self, workers=2, bands_per_worker=2):
+        self.workers = max(1, int(workers))
+        self.bands_per_worker = bands_per_worker
+        self.gbuf = None
+        self.rgb = None
+        self._pool = None
+        self._fb = None
+        self._block = None
+        self._frame_id = 0
+
+    def framebuffers(self, Hr, Wr, zdtype=np.float32):
+        zdtype = np.dtype(zdtype)
+        if self._fb is None or self.gbuf.depth.shape != (Hr, Wr) or self.gbuf.depth.dtype != zdtype:
+            self._release_framebuffers()
+            self._fb = tuple(_Segment(n) for n in (Hr * Wr * zdtype.itemsize, Hr * Wr * 4, Hr * Wr * 8, Hr * Wr * 3))
+            zseg, idseg, baryseg, cseg = self._fb
+            self.gbuf = GBuffer(Hr, Wr, depth=zseg.view((Hr, Wr), zdtype), tri_id=idseg.view((Hr, Wr), np.int32), bary=baryseg.view((Hr, Wr, 2), np.float32))
+            self.rgb = cseg.view((Hr, Wr, 3), np.uint8)
+        return self.gbuf, self.rgb
+
+    def _release_framebuffers(self):
+        if self._fb is None: return
+        self.gbuf = None; self.rgb = None
+        for seg in self._fb:
+            seg.shm.unlink()
+        self._fb = None
+
+    def _upload(self, arrays):
+        fields = {}; size = 0
+        for k, a in arrays.items():
+            a = np.ascontiguousarray(a)
+            arrays[k] = a
+            fields[k] = (size, a.shape, a.dtype.str)
+            size += (a.nbytes + 63) // 64 * 64
+        if self._block is None or self._block.size < size:
+            if self._block is not None:
+                self._block.close(); self._block.unlink()
+            self._block = shared_memory.SharedMemory(create=True, size=max(64, int(size * 1.5)))
+        for k, a in arrays.items():
+            off, shape, dt = fields[k]
+            np.ndarray(shape, dtype=dt, buffer=self._block.buf, offset=off)[...] = a
+        return fields
+
+    def rasterize_mesh(self, zbuf, rgb, shading_mode, lighting, texture, sx, sy, depth, tris, color, tri_uv=None, has_uv=None, normals=None, positions=None, flat_position=False, tile_size=64, gbuf=None, intensities=None, hiz=False, stats=None):
+        if zbuf is not self.gbuf.depth or rgb is not self.rgb or gbuf not in (None, self.gbuf):
+            raise ValueError("Буферы кадра должны быть получены через framebuffers()")
+        if len(tris) == 0: return
+        arrays = {'sx': sx, 'sy': sy, 'depth': depth, 'tris': tris}
+        for k, a in (('tri_uv', tri_uv), ('has_uv', has_uv), ('normals', normals), ('positions', positions), ('intensities', intensities)):
+            if a is not None: arrays[k] = a
+        if texture.use_texture and texture.texture_array is not None:
+            arrays['texels'] = texture.texture_array
+            if texture.filter == 'trilinear':
+                for i, level in enumerate(texture.mipmaps[1:], 1): arrays[f'mip{i}'] = level
+        fields = self._upload(arrays)
+        self._frame_id += 1
+        desc = {
+            'fb': tuple(seg.name for seg in self._fb) + (zbuf.shape[0], zbuf.shape[1], zbuf.dtype.str),
+            'block': self._block.name,
+            'frame': self._frame_id,
+            'fields': fields,
+            'params': {'shading_mode': shading_mode, 'lighting': lighting, 'color': color, 'flat_position': flat_position,
+                       'tile_size': tile_size, 'use_texture': texture.use_texture, 'filter': texture.filter,
+                       'mip_levels': len(texture.mipmaps) if texture.filter == 'trilinear' else 1,
+                       'hiz': hiz, 'stats': stats is not None},
+        }
+        if self._pool is None:
+            self._pool = mp.get_context('spawn').Pool(self.workers)
+        H, W = zbuf.shape
+        rows = -(-H // (self.workers * self.bands_per_worker))
+        step = -(-rows // tile_size) * tile_size
+        regions = [(0, y, W - 1, min(y + step, H) - 1) for y in range(0, H, step)]
+        for part in self._pool.starmap(_render_region, [(desc, r) for r in regions]):
+            if stats is not None: stats.merge(part)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate(); self._pool.join()
+            self._pool = None
+        self._release_framebuffers()
+        if self._block is not None:
+            self._block.close(); self._block.unlink()
+            self._block = None
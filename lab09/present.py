@@ -0,0 +1,49 @@
+import numpy as np
+from PIL import Image, ImageTk
+
+def _sample_axis(n_src, n_dst):
+    pos = (np.arange(n_dst) + 0.5) * (n_src / n_dst) - 0.5
+    i0 = np.clip(np.floor(pos).astype(np.int64), 0, n_src - 1)
+    i1 = np.minimum(i0 + 1, n_src - 1)
+    t = np.clip(pos - i0, 0.0, 1.0).astype(np.float32)
+    return i0, i1, t
+
+def resize_nearest(rgb, height, width, out=None):
+    Hr, Wr = rgb.shape[:2]
+    ys = np.minimum((np.arange(height) + 0.5) * Hr // height, Hr - 1).astype(np.int64)
+    xs = np.minimum((np.arange(width) + 0.5) * Wr // width, Wr - 1).astype(np.int64)
+    if out is None: out = np.empty((height, width, 3), dtype=np.uint8)
+    out[...] = rgb[ys][:, xs]
+    return out
+
+def resize_bilinear(rgb, height, width, out=None):
+    Hr, Wr = rgb.shape[:2]
+    y0, y1, ty = _sample_axis(Hr, height)
+    x0, x1, tx = _sample_axis(Wr, width)
+    src = rgb.astype(np.float32)
+    rows = src[y0] * (1 - ty)[:, None, None] + src[y1] * ty[:, None, None]
+    res = rows[:, x0] * (1 - tx)[None, :, None] + rows[:, x1] * tx[None, :, None]
+    if out is None: out = np.empty((height, width, 3), dtype=np.uint8)
+    np.add(res, 0.5, out=res)
+    out[...] = res
+    return out
+
+class Presenter:
+    def __init__(self, mode='nearest'):
+        self.mode = mode
+        self.photo = None
+        self._frame = None
+
+    def present(self, rgb, width, height):
+        if self._frame is None or self._frame.shape[:2] != (height, width):
+            self._frame = np.full((height, width, 4), 255, dtype=np.uint8)
+            self.photo = ImageTk.PhotoImage("RGBA", (width, height))
+        view = self._frame[..., :3]
+        if rgb.shape[:2] == (height, width):
+            view[...] = rgb
+        elif self.mode == 'bilinear':
+            resize_bilinear(rgb, height, width, view)
+        else:
+            resize_nearest(rgb, height, width, view)
+        self.photo.paste(Image.frombuffer("RGBA", (width, height), self._frame, "raw", "RGBA", 0, 1))
+        return self.photo
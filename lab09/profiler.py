@@ -0,0 +1,101 @@
+import json
+import os
+import time
+from collections import deque
+import numpy as np
+
+class _NullStage:
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULL = _NullStage()
+
+class _Stage:
+    __slots__ = ('prof', 'name', 't0', 'child')
+
+    def __init__(self, prof, name):
+        self.prof = prof; self.name = name; self.child = 0.0
+
+    def __enter__(self):
+        self.prof._stack.append(self)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        t1 = time.perf_counter()
+        p = self.prof
+        p._stack.pop()
+        dur = t1 - self.t0
+        if p._stack: p._stack[-1].child += dur
+        p._frame[self.name] = p._frame.get(self.name, 0.0) + dur - self.child
+        if p.trace is not None:
+            p.trace.append({'name': self.name, 'ph': 'X', 'ts': (self.t0 - p._epoch) * 1e6, 'dur': dur * 1e6, 'pid': os.getpid(), 'tid': 0})
+        return False
+
+class FrameProfiler:
+    def __init__(self, window=120, trace_limit=200000):
+        self.enabled = False
+        self.window = window
+        self.trace_limit = trace_limit
+        self.trace = None
+        self._epoch = time.perf_counter()
+        self.reset()
+
+    def reset(self):
+        self.frames = deque(maxlen=self.window)
+        self.ends = deque(maxlen=self.window)
+        self._frame = {}
+        self._stack = []
+        self._frame_start = None
+
+    def enable(self, enabled=True, trace=False):
+        self.enabled = enabled
+        self.trace = deque(maxlen=self.trace_limit) if enabled and trace else None
+        self.reset()
+
+    def stage(self, name):
+        if not self.enabled: return _NULL
+        if self._frame_start is None: self._frame_start = time.perf_counter()
+        return _Stage(self, name)
+
+    def end_frame(self, **counters):
+        if not self.enabled: return
+        t = time.perf_counter()
+        start = self._frame_start if self._frame_start is not None else t
+        rec = dict(self._frame); rec['frame'] = t - start
+        self.frames.append((rec, counters))
+        self.ends.append(t)
+        if self.trace is not None:
+            self.trace.append({'name': 'frame', 'ph': 'C', 'ts': (t - self._epoch) * 1e6, 'pid': os.getpid(), 'args': counters})
+        self._frame = {}; self._frame_start = None
+
+    def summary(self):
+        if not self.frames: return None
+        names = sorted({k for rec, _ in self.frames for k in rec})
+        stages = {}
+        for name in names:
+            t = np.array([rec.get(name, 0.0) for rec, _ in self.frames])
+            stages[name] = {'mean': float(t.mean()), 'p95': float(np.percentile(t, 95))}
+        counters = {}
+        for name in {k for _, c in self.frames for k in c}:
+            counters[name] = float(np.mean([c.get(name, 0) for _, c in self.frames]))
+        fps = (len(self.ends) - 1) / (self.ends[-1] - self.ends[0]) if len(self.ends) > 1 and self.ends[-1] > self.ends[0] else 0.0
+        return {'fps': fps, 'stages': stages, 'counters': counters}
+
+    def hud_lines(self):
+        s = self.summary()
+        if s is None: return []
+        st = s['stages']
+        lines = [f"FPS {s['fps']:5.1f}  кадр {st['frame']['mean'] * 1000:6.1f} мс  p95 {st['frame']['p95'] * 1000:6.1f}"]
+        for name, v in st.items():
+            if name == 'frame': continue
+            lines.append(f"{name:<10}{v['mean'] * 1000:7.2f} мс  p95 {v['p95'] * 1000:7.2f}")
+        c = s['counters']
+        if c: lines.append("  ".join(f"{k} {v:.0f}" for k, v in sorted(c.items())))
+        return lines
+
+    def dump_trace(self, path):
+        events = list(self.trace) if self.trace is not None else []
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
@@ -0,0 +1,443 @@
+import numpy as np
+from engine import row_norm, normalize_rows
+
+def apply_intensity(color, intensity):
+    out = (np.asarray(color)[None, :] * intensity[:, None]).astype(np.int64)
+    return np.clip(out, 0, 255)
+
+def apply_lighting_to_color(base_color, intensity):
+    r, g, b = base_color
+    r = int(r * intensity); g = int(g * intensity); b = int(b * intensity)
+    return (max(0, min(255, r)), max(0, min(255, g)), max(0, min(255, b)))
+
+def rasterize_triangle_scalar(zbuf, rgb, shading_mode, lighting, texture, sx, sy, zdepth, color, tex_coords=None, normals=None, positions=None, flat_position=False, intensities=None):
+    Hr, Wr = zbuf.shape
+    minx = max(int(np.floor(min(sx))), 0); maxx = min(int(np.ceil(max(sx))), Wr - 1)
+    miny = max(int(np.floor(min(sy))), 0); maxy = min(int(np.ceil(max(sy))), Hr - 1)
+    if minx > maxx or miny > maxy: return
+    x1, y1, z1 = sx[0], sy[0], zdepth[0]
+    x2, y2, z2 = sx[1], sy[1], zdepth[1]
+    x3, y3, z3 = sx[2], sy[2], zdepth[2]
+    denom = ((y2 - y3) * (x1 - x3) + (x3 - x2) * (y1 - y3))
+    if abs(denom) < 1e-8: return
+    A1 = (y2 - y3); B1 = (x3 - x2)
+    A2 = (y3 - y1); B2 = (x1 - x3)
+    Cx = x3; Cy = y3
+    for y in range(miny, maxy + 1):
+        py = y + 0.5
+        for x in range(minx, maxx + 1):
+            px = x + 0.5
+            w1 = (A1 * (px - Cx) + B1 * (py - Cy)) / denom
+            w2 = (A2 * (px - Cx) + B2 * (py - Cy)) / denom
+            w3 = 1.0 - w1 - w2
+            if w1 < 0 or w2 < 0 or w3 < 0: continue
+            z = w1 * z1 + w2 * z2 + w3 * z3
+            if z < zbuf[y, x]:
+                zbuf[y, x] = z
+                if shading_mode == 'phong' and normals is not None and positions is not None:
+                    interp_normal = w1 * normals[0] + w2 * normals[1] + w3 * normals[2]
+                    nrm = np.linalg.norm(interp_normal)
+                    if nrm > 0: interp_normal = interp_normal / nrm
+                    interp_pos = positions[0] if flat_position else w1 * positions[0] + w2 * positions[1] + w3 * positions[2]
+                    view_dir = -interp_pos / (np.linalg.norm(interp_pos) + 1e-12)
+                    intensity = lighting.phong_shading(interp_normal, view_dir, interp_pos)
+                    final_color = apply_lighting_to_color(color, intensity)
+                elif shading_mode == 'gouraud' and intensities is not None:
+                    interp_intensity = w1 * intensities[0] + w2 * intensities[1] + w3 * intensities[2]
+                    final_color = apply_lighting_to_color(color, interp_intensity)
+                else:
+                    final_color = color
+                if texture.use_texture and tex_coords is not None:
+                    u = w1 * tex_coords[0][0] + w2 * tex_coords[1][0] + w3 * tex_coords[2][0]
+                    v = w1 * tex_coords[0][1] + w2 * tex_coords[1][1] + w3 * tex_coords[2][1]
+                    tex_color = texture.get_color(u, v)
+                    if shading_mode != 'none':
+                        if shading_mode == 'gouraud' and intensities is not None:
+                            intensity = interp_intensity
+                        elif not (shading_mode == 'phong' and normals is not None and positions is not None):
+                            intensity = 1.0
+                        tex_color = (int(tex_color[0] * intensity), int(tex_color[1] * intensity), int(tex_color[2] * intensity))
+                    rgb[y, x] = tex_color
+                else:
+                    rgb[y, x] = final_color
+
+def triangle_lod(texture, sx, sy, uv):
+    sx = np.asarray(sx, dtype=np.float64).reshape(-1, 3); sy = np.asarray(sy, dtype=np.float64).reshape(-1, 3)
+    uv = np.asarray(uv, dtype=np.float64).reshape(-1, 3, 2)
+    tu = uv[:, :, 0] * texture.texture_width; tv = uv[:, :, 1] * texture.texture_height
+    screen = np.abs((sx[:, 1] - sx[:, 0]) * (sy[:, 2] - sy[:, 0]) - (sx[:, 2] - sx[:, 0]) * (sy[:, 1] - sy[:, 0]))
+    texels = np.abs((tu[:, 1] - tu[:, 0]) * (tv[:, 2] - tv[:, 0]) - (tu[:, 2] - tu[:, 0]) * (tv[:, 1] - tv[:, 0]))
+    return np.maximum(0.5 * np.log2(np.maximum(texels, 1e-12) / np.maximum(screen, 1e-12)), 0.0)
+
+def shade_fragments(shading_mode, lighting, texture, color, w1, w2, w3, normals=None, positions=None, intensities=None, tex_u=None, tex_v=None, flat_position=False, tex_lod=None):
+    intensity = None
+    if shading_mode == 'phong' and normals is not None and positions is not None:
+        interp_normal = normalize_rows(w1[:, None] * normals[0] + w2[:, None] * normals[1] + w3[:, None] * normals[2])
+        if flat_position:
+            interp_pos = np.broadcast_to(positions[0], interp_normal.shape)
+        else:
+            interp_pos = w1[:, None] * positions[0] + w2[:, None] * positions[1] + w3[:, None] * positions[2]
+        view_dir = -interp_pos / (row_norm(interp_pos) + 1e-12)[:, None]
+        intensity = lighting.phong_shading_batch(interp_normal, view_dir, interp_pos)
+    elif shading_mode == 'gouraud' and intensities is not None:
+        intensity = w1 * intensities[0] + w2 * intensities[1] + w3 * intensities[2]
+    if texture.use_texture and tex_u is not None:
+        u = w1 * tex_u[0] + w2 * tex_u[1] + w3 * tex_u[2]
+        v = w1 * tex_v[0] + w2 * tex_v[1] + w3 * tex_v[2]
+        out = texture.sample(u, v, lod=tex_lod)
+        if shading_mode != 'none' and intensity is not None:
+            out = (out * intensity[:, None]).astype(np.int64)
+        return out
+    if intensity is not None:
+        return apply_intensity(color, intensity)
+    return np.broadcast_to(np.asarray(color), (len(w1), 3))
+
+def rasterize_triangle(zbuf, rgb, shading_mode, lighting, texture, sx, sy, zdepth, color, tex_coords=None, normals=None, positions=None, flat_position=False, intensities=None):
+    Hr, Wr = zbuf.shape
+    minx = max(int(np.floor(min(sx))), 0); maxx = min(int(np.ceil(max(sx))), Wr - 1)
+    miny = max(int(np.floor(min(sy))), 0); maxy = min(int(np.ceil(max(sy))), Hr - 1)
+    if minx > maxx or miny > maxy: return
+    x1, y1, z1 = sx[0], sy[0], zdepth[0]
+    x2, y2, z2 = sx[1], sy[1], zdepth[1]
+    x3, y3, z3 = sx[2], sy[2], zdepth[2]
+    denom = ((y2 - y3) * (x1 - x3) + (x3 - x2) * (y1 - y3))
+    if abs(denom) < 1e-8: return
+    A1 = (y2 - y3); B1 = (x3 - x2)
+    A2 = (y3 - y1); B2 = (x1 - x3)
+    Cx = x3; Cy = y3
+    px = (np.arange(minx, maxx + 1) + 0.5).astype(sx.dtype)[None, :]
+    py = (np.arange(miny, maxy + 1) + 0.5).astype(sy.dtype)[:, None]
+    w1 = (A1 * (px - Cx) + B1 * (py - Cy)) / denom
+    w2 = (A2 * (px - Cx) + B2 * (py - Cy)) / denom
+    w3 = 1.0 - w1 - w2
+    z = w1 * z1 + w2 * z2 + w3 * z3
+    zb = zbuf[miny:maxy + 1, minx:maxx + 1]
+    hit = (w1 >= 0) & (w2 >= 0) & (w3 >= 0) & (z < zb)
+    if not hit.any(): return
+    zb[hit] = z[hit]
+    tex_u = None; tex_v = None; tex_lod = None
+    if shading_mode != 'gouraud':
+        intensities = None
+    elif intensities is None and normals is not None:
+        intensities = lighting.lambert_shading_batch(normals)
+    if tex_coords is not None:
+        tex_u = [tc[0] for tc in tex_coords]; tex_v = [tc[1] for tc in tex_coords]
+        if texture.filter == 'trilinear':
+            tex_lod = np.full(int(hit.sum()), triangle_lod(texture, sx, sy, [tc[:2] for tc in tex_coords])[0])
+    rgb[miny:maxy + 1, minx:maxx + 1][hit] = shade_fragments(shading_mode, lighting, texture, color, w1[hit], w2[hit], w3[hit], normals, positions, intensities, tex_u, tex_v, flat_position, tex_lod)
+
+def cull_triangles(sx, sy, depth, tris, width, height, far=None, backface=False, stats=None):
+    X = sx[tris]; Y = sy[tris]; Z = depth[tris]
+    outside = (np.ceil(X.max(axis=1)) < 0) | (np.floor(X.min(axis=1)) > width - 1) | (np.ceil(Y.max(axis=1)) < 0) | (np.floor(Y.min(axis=1)) > height - 1)
+    if far is not None: outside |= (Z >= far).all(axis=1)
+    back = np.zeros(len(tris), dtype=bool)
+    if backface:
+        area = (X[:, 1] - X[:, 0]) * (Y[:, 2] - Y[:, 0]) - (X[:, 2] - X[:, 0]) * (Y[:, 1] - Y[:, 0])
+        back = (area < 0) & ~outside
+    if stats is not None:
+        stats.culled_back += int(back.sum()); stats.culled_frustum += int(outside.sum())
+    return ~(outside | back)
+
+def frustum_planes(focal, eye_z, near, guard_x=None, guard_y=None):
+    planes = [np.array([0.0, 0.0, -1.0, eye_z - near])]
+    if guard_x is not None:
+        planes += [np.array([-focal, 0.0, -guard_x, guard_x * eye_z]), np.array([focal, 0.0, -guard_x, guard_x * eye_z])]
+    if guard_y is not None:
+        planes += [np.array([0.0, -focal, -guard_y, guard_y * eye_z]), np.array([0.0, focal, -guard_y, guard_y * eye_z])]
+    return planes
+
+def _clip_plane(src, bary, d):
+    inside = d >= 0
+    n_in = inside.sum(axis=1)
+    out_src = [src[n_in == 3]]; out_bary = [bary[n_in == 3]]
+    for count, special in ((1, True), (2, False)):
+        sel = np.flatnonzero(n_in == count)
+        if len(sel) == 0: continue
+        k = np.argmax(inside[sel] == special, axis=1)
+        roll = (k[:, None] + np.arange(3)) % 3
+        rows = np.arange(len(sel))[:, None]
+        b = bary[sel][rows, roll]; dd = d[sel][rows, roll]
+        lerp = lambda i, j: b[:, i] + (b[:, j] - b[:, i]) * (dd[:, i] / (dd[:, i] - dd[:, j]))[:, None]
+        if count == 1:
+            out_src.append(src[sel]); out_bary.append(np.stack([b[:, 0], lerp(0, 1), lerp(0, 2)], axis=1))
+        else:
+            x01 = lerp(0, 1); x20 = lerp(2, 0)
+            out_src += [src[sel], src[sel]]
+            out_bary += [np.stack([x01, b[:, 1], b[:, 2]], axis=1), np.stack([x01, b[:, 2], x20], axis=1)]
+    return np.concatenate(out_src), np.concatenate(out_bary)
+
+class ClipResult:
+    def __init__(self, tris, whole, src, bary):
+        self.tris = tris; self.whole = whole; self.src = src; self.bary = bary
+
+    def extend(self, attr):
+        if attr is None or len(self.src) == 0: return attr
+        c = np.einsum('mij,mj...->mi...', self.bary, attr[self.tris[self.src]])
+        return np.concatenate([attr, c.reshape((-1,) + attr.shape[1:]).astype(attr.dtype)])
+
+    def triangles(self, n_vertices):
+        return np.concatenate([self.tris[self.whole], n_vertices + np.arange(3 * len(self.src)).reshape(-1, 3)])
+
+    def corners(self, tri_attr):
+        c = np.einsum('mij,mj...->mi...', self.bary, tri_attr[self.src]).astype(tri_attr.dtype)
+        return np.concatenate([tri_attr[self.whole], c])
+
+    def faces(self, tri_attr):
+        return np.concatenate([tri_attr[self.whole], tri_attr[self.src]])
+
+def clip_triangles(points, tris, planes, stats=None):
+    hom = np.hstack([points, np.ones((len(points), 1))])
+    dist = np.stack([hom @ p for p in planes], axis=-1)[tris]
+    inside = (dist >= 0).all(axis=(1, 2))
+    whole = np.flatnonzero(inside)
+    src = np.flatnonzero(~inside)
+    bary = np.broadcast_to(np.eye(3), (len(src), 3, 3))
+    for k in range(len(planes)):
+        if len(src) == 0: break
+        src, bary = _clip_plane(src, bary, np.einsum('mij,mj->mi', bary, dist[src, :, k]))
+    order = np.argsort(src, kind='stable')
+    src = src[order]; bary = bary[order]
+    if stats is not None:
+        clipped = len(np.unique(src))
+        stats.clipped += clipped; stats.culled_frustum += len(tris) - len(whole) - clipped
+    return ClipResult(tris, whole, src, bary)
+
+def clip_polygon(points, planes):
+    for p in planes:
+        if len(points) == 0: break
+        d = points @ p[:3] + p[3]
+        out = []
+        for i in range(len(points)):
+            j = (i + 1) % len(points)
+            if d[i] >= 0: out.append(points[i])
+            if (d[i] >= 0) != (d[j] >= 0):
+                out.append(points[i] + (points[j] - points[i]) * (d[i] / (d[i] - d[j])))
+        points = np.array(out).reshape(-1, 3)
+    return points
+
+def _expand_rects(x0, x1, y0, y1):
+    bw = x1 - x0 + 1
+    n = bw * (y1 - y0 + 1)
+    owner = np.repeat(np.arange(len(n)), n)
+    k = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    bw = bw[owner]
+    return owner, x0[owner] + k % bw, y0[owner] + k // bw
+
+def _depth_test(z, zb, tri, tid, ties):
+    if not ties: return z < zb
+    return (z < zb) | ((z == zb) & (tri < tid))
+
+def _tile_dense(zbuf, tid, ties, tri_ids, bx0, bx1, by0, by1, tx0, tx1, ty0, ty1, X, Y, Z, A1, B1, A2, B2, denom):
+    c = lambda a: a[tri_ids][:, None, None]
+    xs = np.arange(tx0, tx1 + 1)[None, None, :]; ys = np.arange(ty0, ty1 + 1)[None, :, None]
+    px = (xs + 0.5).astype(X.dtype); py = (ys + 0.5).astype(Y.dtype)
+    dxc = px - c(X[:, 2]); dyc = py - c(Y[:, 2])
+    w1 = (c(A1) * dxc + c(B1) * dyc) / c(denom)
+    w2 = (c(A2) * dxc + c(B2) * dyc) / c(denom)
+    w3 = 1.0 - w1 - w2
+    z = w1 * c(Z[:, 0]) + w2 * c(Z[:, 1]) + w3 * c(Z[:, 2])
+    inside = (xs >= bx0[:, None, None]) & (xs <= bx1[:, None, None]) & (ys >= by0[:, None, None]) & (ys <= by1[:, None, None])
+    hit = inside & (w1 >= 0) & (w2 >= 0) & (w3 >= 0) & _depth_test(z, zbuf[ty0:ty1 + 1, tx0:tx1 + 1], tri_ids[:, None, None], tid[ty0:ty1 + 1, tx0:tx1 + 1], ties)
+    first = np.argmin(np.where(hit, z, np.inf), axis=0)
+    iy, ix = np.nonzero(hit.any(axis=0))
+    k = first[iy, ix]
+    return tri_ids[k], ix + tx0, iy + ty0, z[k, iy, ix], w1[k, iy, ix], w2[k, iy, ix]
+
+def _tile_sparse(zbuf, tid, ties, tri_ids, bx0, bx1, by0, by1, X, Y, Z, A1, B1, A2, B2, denom):
+    owner, px_i, py_i = _expand_rects(bx0, bx1, by0, by1)
+    tri = tri_ids[owner]
+    px = (px_i + 0.5).astype(X.dtype); py = (py_i + 0.5).astype(Y.dtype)
+    dxc = px - X[tri, 2]; dyc = py - Y[tri, 2]
+    w1 = (A1[tri] * dxc + B1[tri] * dyc) / denom[tri]
+    w2 = (A2[tri] * dxc + B2[tri] * dyc) / denom[tri]
+    w3 = 1.0 - w1 - w2
+    z = w1 * Z[tri, 0] + w2 * Z[tri, 1] + w3 * Z[tri, 2]
+    hit = np.nonzero((w1 >= 0) & (w2 >= 0) & (w3 >= 0) & _depth_test(z, zbuf[py_i, px_i], tri, tid[py_i, px_i], ties))[0]
+    pix = py_i[hit] * zbuf.shape[1] + px_i[hit]
+    srt = np.lexsort((tri[hit], z[hit], pix))
+    hit = hit[srt]; pix = pix[srt]
+    win = hit[np.r_[True, pix[1:] != pix[:-1]]] if len(hit) else hit
+    return tri[win], px_i[win], py_i[win], z[win], w1[win], w2[win]
+
+HIZ_MIN_OVERDRAW = 6.0
+HIZ_MIN_REJECT = 0.25
+
+def hiz_pyramid(depth, cell=8):
+    levels = []
+    a = depth
+    while True:
+        h, w = a.shape
+        if h % cell or w % cell: a = np.pad(a, ((0, -h % cell), (0, -w % cell)), constant_values=-np.inf)
+        a = a.reshape(a.shape[0] // cell, cell, a.shape[1] // cell, cell).max(axis=(1, 3))
+        levels.append(a)
+        if a.shape == (1, 1): return levels
+        cell = 2
+
+def hiz_occluded(levels, x0, x1, y0, y1, zmin, cell=8):
+    zmax = np.full(len(zmin), np.inf)
+    todo = np.ones(len(zmin), dtype=bool)
+    for m in levels:
+        fit = np.flatnonzero(todo & (x1 // cell - x0 // cell <= 1) & (y1 // cell - y0 // cell <= 1))
+        if len(fit):
+            cx0 = x0[fit] // cell; cx1 = x1[fit] // cell; cy0 = y0[fit] // cell; cy1 = y1[fit] // cell
+            zmax[fit] = np.maximum(np.maximum(m[cy0, cx0], m[cy0, cx1]), np.maximum(m[cy1, cx0], m[cy1, cx1]))
+            todo[fit] = False
+        cell *= 2
+    return zmin > zmax
+
+class RasterStats:
+    def __init__(self, n_tris=0):
+        self.culled_back = 0
+        self.culled_frustum = 0
+        self.clipped = 0
+        self.hiz_pixels = 0
+        self.track(n_tris)
+
+    def track(self, n_tris):
+        self.binned = np.zeros(n_tris, dtype=bool)
+        self.kept = np.zeros(n_tris, dtype=bool)
+
+    def merge(self, other):
+        self.binned |= other.binned; self.kept |= other.kept
+        self.hiz_pixels += other.hiz_pixels
+
+    def hiz_triangles(self):
+        return int((self.binned & ~self.kept).sum())
+
+class GBuffer:
+    def __init__(self, height, width, depth=None, tri_id=None, bary=None):
+        self.depth = depth if depth is not None else np.full((height, width), np.inf, dtype=np.float32)
+        self.tri_id = tri_id if tri_id is not None else np.full((height, width), -1, dtype=np.int32)
+        self.bary = bary if bary is not None else np.zeros((height, width, 2), dtype=np.float32)
+
+    def clear(self):
+        self.depth.fill(np.inf)
+        self.tri_id.fill(-1)
+
+class FrameBuffer:
+    def __init__(self, height, width, gbuf=None, rgb=None):
+        self.height = height; self.width = width
+        self.gbuf = gbuf if gbuf is not None else GBuffer(height, width)
+        self.rgb = rgb if rgb is not None else np.zeros((height, width, 3), dtype=np.uint8)
+
+    def clear(self):
+        self.gbuf.clear()
+        self.rgb.fill(0)
+
+def _region(shape, region):
+    return region if region is not None else (0, 0, shape[1] - 1, shape[0] - 1)
+
+def _tile_boxes(tri_ids, minx, maxx, miny, maxy, tx0, tx1, ty0, ty1):
+    return np.maximum(minx[tri_ids], tx0), np.minimum(maxx[tri_ids], tx1), np.maximum(miny[tri_ids], ty0), np.minimum(maxy[tri_ids], ty1)
+
+def _tile_pass(gbuf, ties, tri_ids, minx, maxx, miny, maxy, tx0, tx1, ty0, ty1, geom):
+    zbuf = gbuf.depth
+    bx0, bx1, by0, by1 = _tile_boxes(tri_ids, minx, maxx, miny, maxy, tx0, tx1, ty0, ty1)
+    covered = ((bx1 - bx0 + 1) * (by1 - by0 + 1)).sum()
+    if 2 * covered >= len(tri_ids) * (tx1 - tx0 + 1) * (ty1 - ty0 + 1):
+        tri, fx, fy, z, w1, w2 = _tile_dense(zbuf, gbuf.tri_id, ties, tri_ids, bx0, bx1, by0, by1, tx0, tx1, ty0, ty1, *geom)
+    else:
+        tri, fx, fy, z, w1, w2 = _tile_sparse(zbuf, gbuf.tri_id, ties, tri_ids, bx0, bx1, by0, by1, *geom)
+    if len(tri) == 0: return 0
+    zbuf[fy, fx] = z
+    gbuf.tri_id[fy, fx] = tri
+    gbuf.bary[fy, fx, 0] = w1; gbuf.bary[fy, fx, 1] = w2
+    return len(tri)
+
+def rasterize_gbuffer(gbuf, sx, sy, depth, tris, tile_size=64, region=None, hiz=False, stats=None):
+    zbuf = gbuf.depth
+    Wr = zbuf.shape[1]
+    if len(tris) == 0: return 0
+    rx0, ry0, rx1, ry1 = _region(zbuf.shape, region)
+    X = sx[tris]; Y = sy[tris]; Z = depth[tris]
+    finite = np.isfinite(X).all(axis=1) & np.isfinite(Y).all(axis=1)
+    X = np.where(finite[:, None], X, 0); Y = np.where(finite[:, None], Y, 0)
+    minx = np.maximum(np.floor(X.min(axis=1)).astype(np.int64), rx0); maxx = np.minimum(np.ceil(X.max(axis=1)).astype(np.int64), rx1)
+    miny = np.maximum(np.floor(Y.min(axis=1)).astype(np.int64), ry0); maxy = np.minimum(np.ceil(Y.max(axis=1)).astype(np.int64), ry1)
+    x1, x2, x3 = X.T; y1, y2, y3 = Y.T
+    denom = ((y2 - y3) * (x1 - x3) + (x3 - x2) * (y1 - y3))
+    ids = np.nonzero(finite & (minx <= maxx) & (miny <= maxy) & ~(np.abs(denom) < 1e-8))[0]
+    if len(ids) == 0: return 0
+    A1 = (y2 - y3); B1 = (x3 - x2)
+    A2 = (y3 - y1); B2 = (x1 - x3)
+    geom = (X, Y, Z, A1, B1, A2, B2, denom)
+    zmin = Z.min(axis=1) - 1e-5 * np.abs(Z).max(axis=1)
+    ts = tile_size
+    ntx = (Wr + ts - 1) // ts
+    owner, tile_x, tile_y = _expand_rects(minx[ids] // ts, maxx[ids] // ts, miny[ids] // ts, maxy[ids] // ts)
+    tile_id = tile_y * ntx + tile_x
+    order = np.argsort(tile_id, kind='stable')
+    bin_tri = ids[owner[order]]; tile_id = tile_id[order]
+    cuts = np.flatnonzero(np.diff(tile_id)) + 1
+    written = 0
+    for tri_ids, t in zip(np.split(bin_tri, cuts), tile_id[np.r_[0, cuts]]):
+        tx0 = (t % ntx) * ts; ty0 = (t // ntx) * ts
+        tx1 = min(tx0 + ts - 1, rx1); ty1 = min(ty0 + ts - 1, ry1)
+        tx0 = max(tx0, rx0); ty0 = max(ty0, ry0)
+        if stats is not None: stats.binned[tri_ids] = True
+        passes = [tri_ids]
+        if hiz and len(tri_ids) >= 16:
+            bx0, bx1, by0, by1 = _tile_boxes(tri_ids, minx, maxx, miny, maxy, tx0, tx1, ty0, ty1)
+            if ((bx1 - bx0 + 1) * (by1 - by0 + 1)).sum() >= HIZ_MIN_OVERDRAW * (tx1 - tx0 + 1) * (ty1 - ty0 + 1):
+                order = np.argsort(zmin[tri_ids], kind='stable')
+                passes = [np.sort(tri_ids[part]) for part in np.array_split(order, 4)]
+        k = 0
+        while k < len(passes):
+            pass_ids = passes[k]; k += 1
+            if k > 1:
+                bx0, bx1, by0, by1 = _tile_boxes(pass_ids, minx, maxx, miny, maxy, tx0, tx1, ty0, ty1)
+                bx0 = bx0 - tx0; bx1 = bx1 - tx0; by0 = by0 - ty0; by1 = by1 - ty0
+                occluded = hiz_occluded(hiz_pyramid(zbuf[ty0:ty1 + 1, tx0:tx1 + 1]), bx0, bx1, by0, by1, zmin[pass_ids])
+                if stats is not None: stats.hiz_pixels += int(((bx1 - bx0 + 1) * (by1 - by0 + 1))[occluded].sum())
+                if k < len(passes) and occluded.mean() < HIZ_MIN_REJECT:
+                    passes[k:] = [np.sort(np.concatenate(passes[k:]))]
+                pass_ids = pass_ids[~occluded]
+                if len(pass_ids) == 0: continue
+            if stats is not None: stats.kept[pass_ids] = True
+            written += _tile_pass(gbuf, k > 1, pass_ids, minx, maxx, miny, maxy, tx0, tx1, ty0, ty1, geom)
+    return written
+
+def resolve_gbuffer(gbuf, rgb, shading_mode, lighting, texture, tris, color, tri_uv=None, has_uv=None, normals=None, positions=None, flat_position=False, region=None, screen=None, intensities=None):
+    rx0, ry0, rx1, ry1 = _region(gbuf.tri_id.shape, region)
+    tid = gbuf.tri_id[ry0:ry1 + 1, rx0:rx1 + 1]
+    fy, fx = np.nonzero(tid >= 0)
+    if len(fy) == 0: return
+    tri = tid[fy, fx]
+    fy = fy + ry0; fx = fx + rx0
+    w1 = gbuf.bary[fy, fx, 0]; w2 = gbuf.bary[fy, fx, 1]
+    w3 = 1.0 - w1 - w2
+    corners = tris[tri]
+    vn = None; vp = None; vi = None
+    if normals is not None and shading_mode == 'phong':
+        vn = [normals[corners[:, k]] for k in range(3)]
+    if shading_mode == 'gouraud' and (intensities is not None or normals is not None):
+        lam = intensities
+        if lam is None:
+            used = np.unique(corners)
+            lam = np.zeros(len(normals))
+            lam[used] = lighting.lambert_shading_batch(normals[used])
+        vi = [lam[corners[:, k]] for k in range(3)]
+    if positions is not None:
+        vp = [positions[corners[:, 0 if flat_position else k]] for k in range(3)]
+    textured = np.zeros(len(tri), dtype=bool)
+    if texture.use_texture and tri_uv is not None:
+        textured = has_uv[tri] if has_uv is not None else np.ones(len(tri), dtype=bool)
+    for use_tex in (False, True):
+        sel = textured == use_tex
+        if not sel.any(): continue
+        sel = slice(None) if sel.all() else np.flatnonzero(sel)
+        pick = lambda a: None if a is None else [c[sel] for c in a]
+        tex_u = tex_v = tex_lod = None
+        if use_tex:
+            uv = tri_uv[tri[sel]]
+            tex_u = [uv[:, k, 0] for k in range(3)]; tex_v = [uv[:, k, 1] for k in range(3)]
+            if texture.filter == 'trilinear' and screen is not None:
+                used, inv = np.unique(tri[sel], return_inverse=True)
+                tex_lod = triangle_lod(texture, screen[0][tris[used]], screen[1][tris[used]], tri_uv[used])[inv]
+        rgb[fy[sel], fx[sel]] = shade_fragments(shading_mode, lighting, texture, color, w1[sel], w2[sel], w3[sel], pick(vn), pick(vp), pick(vi), tex_u, tex_v, flat_position, tex_lod)
+
+def rasterize_mesh(zbuf, rgb, shading_mode, lighting, texture, sx, sy, depth, tris, color, tri_uv=None, has_uv=None, normals=None, positions=None, flat_position=False, tile_size=64, region=None, gbuf=None, intensities=None, hiz=False, stats=None):
+    if gbuf is None:
+        gbuf = GBuffer(zbuf.shape[0], zbuf.shape[1], depth=zbuf)
+    if rasterize_gbuffer(gbuf, sx, sy, depth, tris, tile_size, region, hiz, stats):
+        resolve_gbuffer(gbuf, rgb, shading_mode, lighting, texture, tris, color, tri_uv, has_uv, normals, positions, flat_position, region, (sx, sy), intensities)
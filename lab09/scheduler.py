@@ -0,0 +1,50 @@
+import time
+
+class FrameScheduler:
+    def __init__(self, root, advance, render, idle=None, fps=30.0, max_dt=0.25):
+        self.root = root
+        self.advance = advance
+        self.render = render
+        self.idle = idle
+        self.interval = 1.0 / fps
+        self.max_dt = max_dt
+        self.dirty = False
+        self.dropped = 0
+        self._job = None
+        self._due = None
+        self._last = None
+
+    def redraw(self):
+        self.dirty = True
+        self.wake()
+
+    def wake(self, delay=0.0):
+        due = time.perf_counter() + delay
+        if self._job is not None:
+            if self._due <= due: return
+            self.root.after_cancel(self._job)
+        self._due = due
+        self._job = self.root.after(int(delay * 1000), self._run)
+
+    def cancel(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def running(self):
+        return self._job is not None
+
+    def _run(self):
+        self._job = None
+        now = time.perf_counter()
+        dt = 0.0 if self._last is None else now - self._last
+        if dt > self.interval * 1.5: self.dropped += int(dt / self.interval) - 1
+        animating = self.advance(min(dt, self.max_dt))
+        self._last = now if animating else None
+        if animating or self.dirty:
+            self.dirty = False
+            self.render()
+        elif self.idle is not None:
+            self.idle()
+        if animating:
+            self.wake(max(0.0, self.interval - (time.perf_counter() - now)))
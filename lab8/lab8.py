@@ -19,12 +19,54 @@ class Polyhedron:
     def center(self):
         return np.mean(self.V, axis=0)
     def apply_matrix(self, M: np.ndarray):
-        N = self.V.shape[0]
-        hom = np.hstack([self.V, np.ones((N, 1))])
-        transformed = (M @ hom.T).T
-        w = transformed[:, 3:4]
-        w[w == 0] = 1.0
-        self.V = transformed[:, :3] / w
+        self.V = transform_points(self.V, M)
+
+class SceneNode:
+    def __init__(self, mesh, model=None):
+        self.mesh = mesh
+        self.model = np.eye(4) if model is None else np.array(model, dtype=float)
+        self._world = None
+
+    @property
+    def faces(self): return self.mesh.faces
+
+    @property
+    def color(self): return self.mesh.color
+
+    @color.setter
+    def color(self, value): self.mesh.color = value
+
+    @property
+    def name(self): return self.mesh.name
+
+    @name.setter
+    def name(self, value): self.mesh.name = value
+
+    def copy(self):
+        return SceneNode(self.mesh, self.model)
+
+    def apply_matrix(self, M: np.ndarray):
+        self.model = np.asarray(M, dtype=float) @ self.model
+        self._world = None
+
+    @property
+    def V(self):
+        c = self._world
+        if c is None or c[0] is not self.mesh.V:
+            c = self._world = (self.mesh.V, transform_points(self.mesh.V, self.model))
+        return c[1]
+
+    def center(self):
+        M = self.model
+        if M[3, 0] or M[3, 1] or M[3, 2] or M[3, 3] != 1.0: return np.mean(self.V, axis=0)
+        return M[:3, :3] @ self.mesh.center() + M[:3, 3]
+
+def transform_points(V, M):
+    hom = np.hstack([V, np.ones((V.shape[0], 1))])
+    transformed = (M @ hom.T).T
+    w = transformed[:, 3:4]
+    w[w == 0] = 1.0
+    return transformed[:, :3] / w
 
 def matrix_translate(tx, ty, tz):
     M = np.eye(4)
@@ -192,8 +234,8 @@ class PolyhedronApp:
         self.canvas_w = 720
         self.canvas_h = 720
 
-        self.objA = make_cube("#5a9bd8")
-        self.objB = make_cube("#e4a84b")
+        self.objA = SceneNode(make_cube("#5a9bd8"))
+        self.objB = SceneNode(make_cube("#e4a84b"))
         self.objB_enabled = False
 
         self.projection_mode = 'perspective'
@@ -435,8 +477,8 @@ class PolyhedronApp:
         elif name == "Додекаэдр": new = make_dodecahedron(obj.color)
         else: new = make_cube(obj.color)
         new.name = name
-        if which == "A": self.objA = new
-        else: self.objB = new
+        if which == "A": self.objA = SceneNode(new)
+        else: self.objB = SceneNode(new)
         self.fit_in_view(); self.draw()
 
     def toggle_objB(self):
@@ -495,10 +537,10 @@ class PolyhedronApp:
 
     def reset_object(self, which):
         if which == "A":
-            self.objA = make_cube("#5a9bd8")
+            self.objA = SceneNode(make_cube("#5a9bd8"))
             self.poly_var_A.set("Куб")
         else:
-            self.objB = make_cube("#e4a84b")
+            self.objB = SceneNode(make_cube("#e4a84b"))
             self.poly_var_B.set("Куб")
         self.fit_in_view(); self.draw()
 
@@ -516,8 +558,8 @@ class PolyhedronApp:
         self.quality_var.set("100%"); self.render_scale = 1.0
         self.anim_var.set(True); self.anim_enabled = True
         self.objB_on_var.set(False); self.objB_enabled = False
-        self.objA = make_cube("#5a9bd8")
-        self.objB = make_cube("#e4a84b")
+        self.objA = SceneNode(make_cube("#5a9bd8"))
+        self.objB = SceneNode(make_cube("#e4a84b"))
         self.camera_enabled = False; self.cam_enabled_var.set(False)
         self.cam_pos = np.array([0.0, 0.0, 6.0], dtype=float)
         self.cam_target = np.array([0.0, 0.0, 0.0], dtype=float)
@@ -583,6 +625,10 @@ class PolyhedronApp:
         yield self.objA
         if self.objB_enabled: yield self.objB
 
+    def scene_center(self, objs=None):
+        objs = list(self.each_obj()) if objs is None else objs
+        return np.average([o.center() for o in objs], axis=0, weights=[len(o.mesh.V) for o in objs])
+
     def apply_translate_scene(self):
         try:
             tx = float(self.tx.get()); ty = float(self.ty.get()); tz = float(self.tz.get())
@@ -620,8 +666,7 @@ class PolyhedronApp:
             f = float(self.factor_e.get())
         except ValueError:
             messagebox.showerror("Ошибка ввода", "Коэффициент должен быть числом"); return
-        allV = np.vstack([o.V for o in self.each_obj()])
-        c = np.mean(allV, axis=0)
+        c = self.scene_center()
         M = matrix_translate(-c[0], -c[1], -c[2]) @ matrix_scale(f, f, f) @ matrix_translate(c[0], c[1], c[2])
         for o in self.each_obj(): o.apply_matrix(M)
         self.draw()
@@ -631,7 +676,7 @@ class PolyhedronApp:
             angle = math.radians(float(self.angle_axis_e.get()))
         except ValueError:
             messagebox.showerror("Ошибка ввода", "Угол должен быть числом"); return
-        allV = np.vstack([o.V for o in self.each_obj()]); c = np.mean(allV, axis=0)
+        c = self.scene_center()
         axis = self.axis_var.get()
         M = matrix_rotate_axis_through_point(axis, angle, c)
         for o in self.each_obj(): o.apply_matrix(M)
@@ -646,10 +691,10 @@ class PolyhedronApp:
             messagebox.showerror("Ошибка загрузки", str(e)); return
         if which == "A":
             poly.color = self.objA.color
-            self.objA = poly
+            self.objA = SceneNode(poly)
         else:
             poly.color = self.objB.color
-            self.objB = poly
+            self.objB = SceneNode(poly)
         self.fit_in_view(); self.draw()
 
     def save_obj_dialog(self, which):
@@ -1011,8 +1056,7 @@ class PolyhedronApp:
         if self.anim_enabled:
             objs = [self.objA] + ([self.objB] if self.objB_enabled else [])
             if objs:
-                allV = np.vstack([o.V for o in objs])
-                c = np.mean(allV, axis=0)
+                c = self.scene_center(objs)
                 M = matrix_translate(-c[0], -c[1], -c[2]) @ matrix_rotate_y(math.radians(2.0)) @ matrix_translate(c[0], c[1], c[2])
                 for o in objs: o.apply_matrix(M)
                 did_draw = True